@@ -77,6 +77,9 @@ class BatteryData:
     def get_island(self, bus_idx):
         return tp.get_elements_of_the_island(self.C_bus_batt.T, bus_idx)
 
+    def slice_by_buses(self, bus_idx, time_idx=None, bus_mask=None):
+        return tp.slice_by_buses(self, self.C_bus_batt.T, bus_idx, time_idx, bus_mask)
+
     def get_injections(self):
         """
         Compute the active and reactive power of non-controlled batteries (assuming all)
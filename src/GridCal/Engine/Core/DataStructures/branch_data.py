@@ -28,6 +28,14 @@ def get_bus_indices(C_branch_bus):
     return F
 
 
+# per-branch float fields stored contiguously in BranchData.buffer, {name: default value}
+# a, b, c: composite losses curve (a * x^2 + b * x + c); alpha1, alpha2, alpha3: converter losses parameters
+BRANCH_FLOAT_FIELDS = {'a': 0.0, 'b': 0.0, 'c': 0.0,
+                       'R': 0.0, 'X': 0.0, 'G': 0.0, 'B': 0.0, 'k': 1.0,
+                       'm_min': 0.1, 'm_max': 1.5, 'theta_min': -6.28, 'theta_max': 6.28,
+                       'Kdp': 1.0, 'Kdp_va': 1.0, 'alpha1': 0.0, 'alpha2': 0.0, 'alpha3': 0.0}
+
+
 class BranchData:
 
     def __init__(self, nbr, nbus, ntime=1):
@@ -50,23 +58,12 @@ class BranchData:
         self.F = np.zeros(self.nbr, dtype=int)  # indices of the "from" buses
         self.T = np.zeros(self.nbr, dtype=int)  # indices of the "to" buses
 
-        # composite losses curve (a * x^2 + b * x + c)
-        self.a = np.zeros(self.nbr, dtype=float)
-        self.b = np.zeros(self.nbr, dtype=float)
-        self.c = np.zeros(self.nbr, dtype=float)
-
-        self.R = np.zeros(self.nbr, dtype=float)
-        self.X = np.zeros(self.nbr, dtype=float)
-        self.G = np.zeros(self.nbr, dtype=float)
-        self.B = np.zeros(self.nbr, dtype=float)
-        self.k = np.ones(nbr, dtype=float)
+        # one contiguous (n_fields, nbr) buffer for the per-branch float fields, each field is a row view
+        self.buffer = np.empty((len(BRANCH_FLOAT_FIELDS), self.nbr), dtype=float)
+        self.set_buffer_views(defaults=True)
 
         self.m = np.ones((nbr, ntime), dtype=float)
-        self.m_min = 0.1 * np.ones(nbr, dtype=float)
-        self.m_max = 1.5 * np.ones(nbr, dtype=float)
         self.theta = np.zeros((nbr, ntime), dtype=float)
-        self.theta_min = - 6.28 * np.ones(nbr, dtype=float)
-        self.theta_max = 6.28 * np.ones(nbr, dtype=float)
         self.Beq = np.zeros((nbr, ntime), dtype=float)
         self.G0 = np.zeros((nbr, ntime), dtype=float)
 
@@ -79,11 +76,6 @@ class BranchData:
         self.vf_set = np.ones((nbr, ntime))
         self.vt_set = np.ones((nbr, ntime))
 
-        self.Kdp = np.ones(self.nbr)
-        self.Kdp_va = np.ones(self.nbr)
-        self.alpha1 = np.zeros(self.nbr)  # converter losses parameter (alpha1)
-        self.alpha2 = np.zeros(self.nbr)  # converter losses parameter (alpha2)
-        self.alpha3 = np.zeros(self.nbr)  # converter losses parameter (alpha3)
         self.control_mode = np.zeros(self.nbr, dtype=object)
 
         self.contingency_enabled = np.ones(self.nbr, dtype=int)
@@ -92,6 +84,16 @@ class BranchData:
         self.C_branch_bus_f = sp.lil_matrix((self.nbr, nbus), dtype=int)  # connectivity branch with their "from" bus
         self.C_branch_bus_t = sp.lil_matrix((self.nbr, nbus), dtype=int)  # connectivity branch with their "to" bus
 
+    def set_buffer_views(self, defaults=False):
+        """
+        Point the per-branch float fields (R, X, G, B, k, m_min, ...) to the rows of the buffer
+        :param defaults: fill the buffer with the default values of the fields
+        """
+        for i, (name, default) in enumerate(BRANCH_FLOAT_FIELDS.items()):
+            if defaults:
+                self.buffer[i, :] = default
+            setattr(self, name, self.buffer[i])
+
     def slice(self, elm_idx, bus_idx, time_idx=None):
         """
         Slice this class
@@ -111,19 +113,13 @@ class BranchData:
         data.branch_names = self.branch_names[elm_idx]
         # data.F = self.F[elm_idx]
         # data.T = self.T[elm_idx]
-        data.R = self.R[elm_idx]
-        data.X = self.X[elm_idx]
-        data.G = self.G[elm_idx]
-        data.B = self.B[elm_idx]
-        data.k = self.k[elm_idx]
+
+        # all the per-branch float fields in one go
+        data.buffer = self.buffer[:, elm_idx]
+        data.set_buffer_views()
+
         data.tap_t = self.tap_f[elm_idx]
         data.tap_f = self.tap_t[elm_idx]
-        data.Kdp = self.Kdp[elm_idx]
-        data.Kdp_va = self.Kdp_va[elm_idx]
-
-        data.alpha1 = self.alpha1[elm_idx]
-        data.alpha2 = self.alpha2[elm_idx]
-        data.alpha3 = self.alpha3[elm_idx]
 
         data.control_mode = self.control_mode[elm_idx]
         data.branch_active = self.branch_active[tidx]
@@ -131,11 +127,7 @@ class BranchData:
         data.branch_rates = self.branch_rates[tidx]
         data.branch_contingency_rates = self.branch_contingency_rates[tidx]
         data.m = self.m[tidx]
-        data.m_min = self.m_min[elm_idx]
-        data.m_max = self.m_max[elm_idx]
         data.theta = self.theta[tidx]
-        data.theta_min = self.theta_min[elm_idx]
-        data.theta_max = self.theta_max[elm_idx]
         data.Beq = self.Beq[tidx]
         data.G0 = self.G0[tidx]
         data.Pfset = self.Pfset[tidx]
@@ -163,6 +155,9 @@ class BranchData:
         """
         return tp.get_elements_of_the_island(self.C_branch_bus_f + self.C_branch_bus_t, bus_idx)
 
+    def slice_by_buses(self, bus_idx, time_idx=None, bus_mask=None):
+        return tp.slice_by_buses(self, self.C_branch_bus_f + self.C_branch_bus_t, bus_idx, time_idx, bus_mask)
+
     def get_contingency_enabled_indices(self):
 
         return np.where(self.contingency_enabled == 1)[0]
@@ -1,3 +1,4 @@
+import numpy as np
 from GridCal.Engine.basic_structures import Logger
 from GridCal.Engine.Core.multi_circuit import MultiCircuit
 from GridCal.Engine.basic_structures import BranchImpedanceMode
@@ -58,6 +59,8 @@ def get_load_data(circuit: MultiCircuit, bus_dict, opf_results=None, time_series
     else:
         data = LoadData(nload=len(devices), nbus=len(circuit.buses), ntime=ntime)
 
+    bus_idx = np.empty(len(devices), dtype=int)
+
     for k, elm in enumerate(devices):
 
         i = bus_dict[elm.bus]
@@ -83,7 +86,10 @@ def get_load_data(circuit: MultiCircuit, bus_dict, opf_results=None, time_series
             if opf_results is not None:
                 data.load_s[k] -= opf_results.load_shedding[k]
 
-        data.C_bus_load[i, k] = 1
+        bus_idx[k] = i
+
+    # set the connectivity at once
+    data.C_bus_load[bus_idx, np.arange(len(devices))] = 1
 
     return data
 
@@ -100,6 +106,8 @@ def get_static_generator_data(circuit: MultiCircuit, bus_dict, time_series=False
 
     data = StaticGeneratorData(nstagen=len(devices), nbus=len(circuit.buses), ntime=ntime)
 
+    bus_idx = np.empty(len(devices), dtype=int)
+
     for k, elm in enumerate(devices):
 
         i = bus_dict[elm.bus]
@@ -113,7 +121,10 @@ def get_static_generator_data(circuit: MultiCircuit, bus_dict, time_series=False
             data.static_generator_active[k] = elm.active
             data.static_generator_s[k] = complex(elm.P, elm.Q)
 
-        data.C_bus_static_generator[i, k] = 1
+        bus_idx[k] = i
+
+    # set the connectivity at once
+    data.C_bus_static_generator[bus_idx, np.arange(len(devices))] = 1
 
     return data
 
@@ -130,6 +141,8 @@ def get_shunt_data(circuit: MultiCircuit, bus_dict, Vbus, logger: Logger, time_s
 
     data = ShuntData(nshunt=len(devices), nbus=len(circuit.buses), ntime=ntime)
 
+    bus_idx = np.empty(len(devices), dtype=int)
+
     for k, elm in enumerate(devices):
 
         i = bus_dict[elm.bus]
@@ -151,7 +164,10 @@ def get_shunt_data(circuit: MultiCircuit, bus_dict, Vbus, logger: Logger, time_s
         elif elm.Vset != Vbus[i, 0]:
             logger.add_error('Different set points', elm.bus.name, elm.Vset, Vbus[i, 0])
 
-        data.C_bus_shunt[i, k] = 1
+        bus_idx[k] = i
+
+    # set the connectivity at once
+    data.C_bus_shunt[bus_idx, np.arange(len(devices))] = 1
 
     return data
 
@@ -177,6 +193,8 @@ def get_generator_data(circuit: MultiCircuit, bus_dict, Vbus, logger: Logger,
     else:
         data = GeneratorData(ngen=len(devices), nbus=len(circuit.buses), ntime=ntime)
 
+    bus_idx = np.empty(len(devices), dtype=int)
+
     for k, elm in enumerate(devices):
 
         i = bus_dict[elm.bus]
@@ -218,13 +236,16 @@ def get_generator_data(circuit: MultiCircuit, bus_dict, Vbus, logger: Logger,
             if opf_results is not None:
                 data.generator_p[k] = opf_results.generator_power[k] - opf_results.generator_shedding[k]
 
-        data.C_bus_gen[i, k] = 1
+        bus_idx[k] = i
 
         if Vbus[i, 0].real == 1.0:
             Vbus[i, :] = complex(elm.Vset, 0)
         elif elm.Vset != Vbus[i, 0]:
             logger.add_error('Different set points', elm.bus.name, elm.Vset, Vbus[i, 0])
 
+    # set the connectivity at once
+    data.C_bus_gen[bus_idx, np.arange(len(devices))] = 1
+
     return data
 
 
@@ -249,6 +270,8 @@ def get_battery_data(circuit: MultiCircuit, bus_dict, Vbus, logger: Logger,
     else:
         data = BatteryData(nbatt=len(devices), nbus=len(circuit.buses), ntime=ntime)
 
+    bus_idx = np.empty(len(devices), dtype=int)
+
     for k, elm in enumerate(devices):
 
         i = bus_dict[elm.bus]
@@ -302,13 +325,16 @@ def get_battery_data(circuit: MultiCircuit, bus_dict, Vbus, logger: Logger,
             if opf_results is not None:
                 data.battery_p[k] = opf_results.battery_power[k]
 
-        data.C_bus_batt[i, k] = 1
+        bus_idx[k] = i
 
         if Vbus[i, 0].real == 1.0:
             Vbus[i, :] = complex(elm.Vset, 0)
         elif elm.Vset != Vbus[i, 0]:
             logger.add_error('Different set points', elm.bus.name, elm.Vset, Vbus[i, 0])
 
+    # set the connectivity at once
+    data.C_bus_batt[bus_idx, np.arange(len(devices))] = 1
+
     return data
 
 
@@ -326,6 +352,9 @@ def get_line_data(circuit: MultiCircuit, bus_dict,
 
     nc = LinesData(nline=len(circuit.lines), nbus=len(circuit.buses))
 
+    F = np.empty(len(circuit.lines), dtype=int)
+    T = np.empty(len(circuit.lines), dtype=int)
+
     # Compile the lines
     for i, elm in enumerate(circuit.lines):
         # generic stuff
@@ -346,8 +375,13 @@ def get_line_data(circuit: MultiCircuit, bus_dict,
 
         nc.line_X[i] = elm.X
         nc.line_B[i] = elm.B
-        nc.C_line_bus[i, f] = 1
-        nc.C_line_bus[i, t] = 1
+        F[i] = f
+        T[i] = t
+
+    # set the connectivity at once
+    elm_idx = np.arange(len(circuit.lines))
+    nc.C_line_bus[elm_idx, F] = 1
+    nc.C_line_bus[elm_idx, T] = 1
 
     return nc
 
@@ -361,6 +395,9 @@ def get_transformer_data(circuit: MultiCircuit, bus_dict, time_series=False, nti
     """
     data = TransformerData(ntr=len(circuit.transformers2w), nbus=len(circuit.buses))
 
+    F = np.empty(len(circuit.transformers2w), dtype=int)
+    T = np.empty(len(circuit.transformers2w), dtype=int)
+
     # 2-winding transformers
     for i, elm in enumerate(circuit.transformers2w):
 
@@ -375,8 +412,8 @@ def get_transformer_data(circuit: MultiCircuit, bus_dict, time_series=False, nti
         data.tr_G[i] = elm.G
         data.tr_B[i] = elm.B
 
-        data.C_tr_bus[i, f] = 1
-        data.C_tr_bus[i, t] = 1
+        F[i] = f
+        T[i] = t
 
         # tap changer
         data.tr_tap_mod[i] = elm.tap_module
@@ -395,6 +432,11 @@ def get_transformer_data(circuit: MultiCircuit, bus_dict, time_series=False, nti
         # virtual taps for transformers where the connection voltage is off
         data.tr_tap_f[i], data.tr_tap_t[i] = elm.get_virtual_taps()
 
+    # set the connectivity at once
+    elm_idx = np.arange(len(circuit.transformers2w))
+    data.C_tr_bus[elm_idx, F] = 1
+    data.C_tr_bus[elm_idx, T] = 1
+
     return data
 
 
@@ -407,6 +449,9 @@ def get_vsc_data(circuit: MultiCircuit, bus_dict, time_series=False, ntime=1):
     """
     nc = VscData(nvsc=len(circuit.vsc_devices), nbus=len(circuit.buses), ntime=ntime)
 
+    F = np.empty(len(circuit.vsc_devices), dtype=int)
+    T = np.empty(len(circuit.vsc_devices), dtype=int)
+
     # VSC
     for i, elm in enumerate(circuit.vsc_devices):
 
@@ -429,8 +474,13 @@ def get_vsc_data(circuit: MultiCircuit, bus_dict, time_series=False, ntime=1):
         nc.Vdc_set[i] = elm.Vdc_set
         nc.control_mode[i] = elm.control_mode
 
-        nc.C_vsc_bus[i, f] = 1
-        nc.C_vsc_bus[i, t] = 1
+        F[i] = f
+        T[i] = t
+
+    # set the connectivity at once
+    elm_idx = np.arange(len(circuit.vsc_devices))
+    nc.C_vsc_bus[elm_idx, F] = 1
+    nc.C_vsc_bus[elm_idx, T] = 1
 
     return nc
 
@@ -444,6 +494,9 @@ def get_upfc_data(circuit: MultiCircuit, bus_dict, time_series=False, ntime=1):
     """
     data = UpfcData(nelm=len(circuit.upfc_devices), nbus=len(circuit.buses), ntime=ntime)
 
+    F = np.empty(len(circuit.upfc_devices), dtype=int)
+    T = np.empty(len(circuit.upfc_devices), dtype=int)
+
     # UPFC
     for i, elm in enumerate(circuit.upfc_devices):
 
@@ -467,8 +520,13 @@ def get_upfc_data(circuit: MultiCircuit, bus_dict, time_series=False, ntime=1):
         data.Qset[i] = elm.Qfset
         data.Vsh[i] = elm.Vsh
 
-        data.C_elm_bus[i, f] = 1
-        data.C_elm_bus[i, t] = 1
+        F[i] = f
+        T[i] = t
+
+    # set the connectivity at once
+    elm_idx = np.arange(len(circuit.upfc_devices))
+    data.C_elm_bus[elm_idx, F] = 1
+    data.C_elm_bus[elm_idx, T] = 1
 
     return data
 
@@ -485,6 +543,9 @@ def get_dc_line_data(circuit: MultiCircuit, bus_dict,
     """
     data = DcLinesData(ndcline=len(circuit.dc_lines), nbus=len(circuit.buses), ntime=ntime)
 
+    F = np.empty(len(circuit.dc_lines), dtype=int)
+    T = np.empty(len(circuit.dc_lines), dtype=int)
+
     # DC-lines
     for i, elm in enumerate(circuit.dc_lines):
 
@@ -506,8 +567,8 @@ def get_dc_line_data(circuit: MultiCircuit, bus_dict,
             data.dc_line_R[i] *= (1 + elm.tolerance / 100.0)
 
         data.dc_line_impedance_tolerance[i] = elm.tolerance
-        data.C_dc_line_bus[i, f] = 1
-        data.C_dc_line_bus[i, t] = 1
+        F[i] = f
+        T[i] = t
         data.dc_F[i] = f
         data.dc_T[i] = t
 
@@ -516,6 +577,11 @@ def get_dc_line_data(circuit: MultiCircuit, bus_dict,
         data.dc_line_temp_oper[i] = elm.temp_oper
         data.dc_line_alpha[i] = elm.alpha
 
+    # set the connectivity at once
+    elm_idx = np.arange(len(circuit.dc_lines))
+    data.C_dc_line_bus[elm_idx, F] = 1
+    data.C_dc_line_bus[elm_idx, T] = 1
+
     return data
 
 
@@ -569,8 +635,6 @@ def get_branch_data(circuit: MultiCircuit, bus_dict, Vbus, apply_temperature,
 
         f = bus_dict[elm.bus_from]
         t = bus_dict[elm.bus_to]
-        data.C_branch_bus_f[i, f] = 1
-        data.C_branch_bus_t[i, t] = 1
         data.F[i] = f
         data.T[i] = t
 
@@ -615,8 +679,6 @@ def get_branch_data(circuit: MultiCircuit, bus_dict, Vbus, apply_temperature,
             if opf:
                 data.branch_cost[ii, :] = elm.Cost
 
-        data.C_branch_bus_f[ii, f] = 1
-        data.C_branch_bus_t[ii, t] = 1
         data.F[ii] = f
         data.T[ii] = t
 
@@ -669,8 +731,6 @@ def get_branch_data(circuit: MultiCircuit, bus_dict, Vbus, apply_temperature,
             if opf:
                 data.branch_cost[ii] = elm.Cost
 
-        data.C_branch_bus_f[ii, f] = 1
-        data.C_branch_bus_t[ii, t] = 1
         data.F[ii] = f
         data.T[ii] = t
 
@@ -750,8 +810,6 @@ def get_branch_data(circuit: MultiCircuit, bus_dict, Vbus, apply_temperature,
             if opf:
                 data.branch_cost[ii] = elm.Cost
 
-        data.C_branch_bus_f[ii, f] = 1
-        data.C_branch_bus_t[ii, t] = 1
         data.F[ii] = f
         data.T[ii] = t
 
@@ -793,8 +851,6 @@ def get_branch_data(circuit: MultiCircuit, bus_dict, Vbus, apply_temperature,
             if opf:
                 data.branch_cost[ii] = elm.Cost
 
-        data.C_branch_bus_f[ii, f] = 1
-        data.C_branch_bus_t[ii, t] = 1
         data.F[ii] = f
         data.T[ii] = t
 
@@ -807,6 +863,11 @@ def get_branch_data(circuit: MultiCircuit, bus_dict, Vbus, apply_temperature,
         data.contingency_enabled[ii] = int(elm.contingency_enabled)
         data.monitor_loading[ii] = int(elm.monitor_loading)
 
+    # set the connectivity at once from the F and T indices
+    br_idx = np.arange(nbr)
+    data.C_branch_bus_f[br_idx, data.F] = 1
+    data.C_branch_bus_t[br_idx, data.T] = 1
+
     return data
 
 
@@ -820,6 +881,9 @@ def get_hvdc_data(circuit: MultiCircuit, bus_dict, bus_types, time_series=False,
     """
     data = HvdcData(nhvdc=len(circuit.hvdc_lines), nbus=len(circuit.buses), ntime=ntime)
 
+    F = np.empty(len(circuit.hvdc_lines), dtype=int)
+    T = np.empty(len(circuit.hvdc_lines), dtype=int)
+
     # HVDC
     for i, elm in enumerate(circuit.hvdc_lines):
 
@@ -857,8 +921,12 @@ def get_hvdc_data(circuit: MultiCircuit, bus_dict, bus_types, time_series=False,
             bus_types[f] = BusMode.PV.value
             bus_types[t] = BusMode.PV.value
 
-        # the the bus-hvdc line connectivity
-        data.C_hvdc_bus_f[i, f] = 1
-        data.C_hvdc_bus_t[i, t] = 1
+        F[i] = f
+        T[i] = t
+
+    # the the bus-hvdc line connectivity
+    elm_idx = np.arange(len(circuit.hvdc_lines))
+    data.C_hvdc_bus_f[elm_idx, F] = 1
+    data.C_hvdc_bus_t[elm_idx, T] = 1
 
     return data
@@ -71,6 +71,9 @@ class DcLinesData:
         """
         return tp.get_elements_of_the_island(self.C_dc_line_bus, bus_idx)
 
+    def slice_by_buses(self, bus_idx, time_idx=None, bus_mask=None):
+        return tp.slice_by_buses(self, self.C_dc_line_bus, bus_idx, time_idx, bus_mask)
+
     def DC_R_corrected(self):
         """
         Returns temperature corrected resistances (numpy array) based on a formula
@@ -105,6 +105,9 @@ class HvdcData:
         """
         return tp.get_elements_of_the_island(self.C_hvdc_bus_f + self.C_hvdc_bus_t, bus_idx)
 
+    def slice_by_buses(self, bus_idx, time_idx=None, bus_mask=None):
+        return tp.slice_by_buses(self, self.C_hvdc_bus_f + self.C_hvdc_bus_t, bus_idx, time_idx, bus_mask)
+
     def get_injections_per_bus(self):
         F = self.C_hvdc_bus_f.T * (self.active * self.Pf)
         T = self.C_hvdc_bus_t.T * (self.active * self.Pt)
@@ -71,6 +71,9 @@ class ShuntData:
     def get_island(self, bus_idx):
         return tp.get_elements_of_the_island(self.C_bus_shunt.T, bus_idx)
 
+    def slice_by_buses(self, bus_idx, time_idx=None, bus_mask=None):
+        return tp.slice_by_buses(self, self.C_bus_shunt.T, bus_idx, time_idx, bus_mask)
+
     def get_controlled_per_bus(self):
         return self.C_bus_shunt * (self.shunt_controlled * self.shunt_active)
 
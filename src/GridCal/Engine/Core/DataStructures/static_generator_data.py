@@ -61,6 +61,9 @@ class StaticGeneratorData:
     def get_island(self, bus_idx):
         return tp.get_elements_of_the_island(self.C_bus_static_generator.T, bus_idx)
 
+    def slice_by_buses(self, bus_idx, time_idx=None, bus_mask=None):
+        return tp.slice_by_buses(self, self.C_bus_static_generator.T, bus_idx, time_idx, bus_mask)
+
     def get_injections_per_bus(self):
         return self.C_bus_static_generator * (self.static_generator_s * self.static_generator_active)
 
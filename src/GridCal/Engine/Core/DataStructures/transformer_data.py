@@ -90,5 +90,8 @@ class TransformerData:
         """
         return tp.get_elements_of_the_island(self.C_tr_bus, bus_idx)
 
+    def slice_by_buses(self, bus_idx, time_idx=None, bus_mask=None):
+        return tp.slice_by_buses(self, self.C_tr_bus, bus_idx, time_idx, bus_mask)
+
     def __len__(self):
         return self.ntr
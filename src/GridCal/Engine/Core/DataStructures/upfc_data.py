@@ -89,5 +89,8 @@ class UpfcData:
         """
         return tp.get_elements_of_the_island(self.C_elm_bus, bus_idx)
 
+    def slice_by_buses(self, bus_idx, time_idx=None, bus_mask=None):
+        return tp.slice_by_buses(self, self.C_elm_bus, bus_idx, time_idx, bus_mask)
+
     def __len__(self):
         return self.nelm
@@ -89,6 +89,9 @@ class VscData:
         """
         return tp.get_elements_of_the_island(self.C_vsc_bus, bus_idx)
 
+    def slice_by_buses(self, bus_idx, time_idx=None, bus_mask=None):
+        return tp.slice_by_buses(self, self.C_vsc_bus, bus_idx, time_idx, bus_mask)
+
     def get_bus_indices_f(self):
         return self.C_vsc_bus.tocsc().indices
 
@@ -175,6 +175,19 @@ def compute_split_admittances(R, X, G, B, k, m, mf, mt, theta, Beq, If, Cf, Ct,
     return Yseries, Yshunt
 
 
+def split_sparse(Y):
+    """
+    Split a complex sparse matrix into its real and imaginary CSR parts
+    each part owns its data, indices and indptr arrays (Y.data.real is a view of Y.data, and scipy modifies
+    the index arrays in place when sorting or summing duplicates), so no part aliases Y or the other part
+    :param Y: complex sparse matrix
+    :return: real part CSR matrix, imaginary part CSR matrix
+    """
+    Y = Y.tocsr()
+    return sp.csr_matrix((Y.data.real.copy(), Y.indices.copy(), Y.indptr.copy()), shape=Y.shape), \
+           sp.csr_matrix((Y.data.imag.copy(), Y.indices.copy(), Y.indptr.copy()), shape=Y.shape)
+
+
 def compute_fast_decoupled_admittances(X, B, m, mf, mt, Cf, Ct):
     """
     Compute the admittance matrices for the fast decoupled method
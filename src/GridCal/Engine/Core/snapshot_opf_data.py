@@ -13,6 +13,7 @@
 # You should have received a copy of the GNU General Public License
 # along with GridCal.  If not, see <http://www.gnu.org/licenses/>.
 
+import numpy as np
 from GridCal.Engine.basic_structures import Logger
 from GridCal.Engine.Core.multi_circuit import MultiCircuit
 from GridCal.Engine.basic_structures import BranchImpedanceMode
@@ -122,20 +123,24 @@ class SnapshotOpfData(SnapshotData):
         :return: SnapshotData
         """
 
-        # find the indices of the devices of the island
-        line_idx = self.line_data.get_island(bus_idx)
-        dc_line_idx = self.dc_line_data.get_island(bus_idx)
-        tr_idx = self.transformer_data.get_island(bus_idx)
-        vsc_idx = self.vsc_data.get_island(bus_idx)
-        hvdc_idx = self.hvdc_data.get_island(bus_idx)
-        br_idx = self.branch_data.get_island(bus_idx)
-        upfc_idx = self.upfc_data.get_island(bus_idx)
-
-        load_idx = self.load_data.get_island(bus_idx)
-        stagen_idx = self.static_generator_data.get_island(bus_idx)
-        gen_idx = self.generator_data.get_island(bus_idx)
-        batt_idx = self.battery_data.get_island(bus_idx)
-        shunt_idx = self.shunt_data.get_island(bus_idx)
+        # mark the island buses once, all the devices look up their buses in this mask
+        bus_mask = np.zeros(self.nbus, dtype=bool)
+        bus_mask[bus_idx] = True
+
+        # find the indices of the devices of the island and slice their data in one go
+        line_idx, line_data = self.line_data.slice_by_buses(bus_idx, time_idx, bus_mask)
+        dc_line_idx, dc_line_data = self.dc_line_data.slice_by_buses(bus_idx, time_idx, bus_mask)
+        tr_idx, transformer_data = self.transformer_data.slice_by_buses(bus_idx, time_idx, bus_mask)
+        vsc_idx, vsc_data = self.vsc_data.slice_by_buses(bus_idx, time_idx, bus_mask)
+        hvdc_idx, hvdc_data = self.hvdc_data.slice_by_buses(bus_idx, time_idx, bus_mask)
+        br_idx, branch_data = self.branch_data.slice_by_buses(bus_idx, time_idx, bus_mask)
+        upfc_idx, upfc_data = self.upfc_data.slice_by_buses(bus_idx, time_idx, bus_mask)
+
+        load_idx, load_data = self.load_data.slice_by_buses(bus_idx, time_idx, bus_mask)
+        stagen_idx, static_generator_data = self.static_generator_data.slice_by_buses(bus_idx, time_idx, bus_mask)
+        gen_idx, generator_data = self.generator_data.slice_by_buses(bus_idx, time_idx, bus_mask)
+        batt_idx, battery_data = self.battery_data.slice_by_buses(bus_idx, time_idx, bus_mask)
+        shunt_idx, shunt_data = self.shunt_data.slice_by_buses(bus_idx, time_idx, bus_mask)
 
         nc = SnapshotOpfData(nbus=len(bus_idx),
                              nline=len(line_idx),
@@ -158,6 +163,7 @@ class SnapshotOpfData(SnapshotData):
         nc.original_tr_idx = tr_idx
         nc.original_dc_line_idx = dc_line_idx
         nc.original_vsc_idx = vsc_idx
+        nc.original_upfc_idx = upfc_idx
         nc.original_hvdc_idx = hvdc_idx
         nc.original_gen_idx = gen_idx
         nc.original_bat_idx = batt_idx
@@ -165,19 +171,20 @@ class SnapshotOpfData(SnapshotData):
         nc.original_stagen_idx = stagen_idx
         nc.original_shunt_idx = shunt_idx
 
-        # slice data
+        # set the sliced data
         nc.bus_data = self.bus_data.slice(bus_idx, time_idx)
-        nc.branch_data = self.branch_data.slice(br_idx, bus_idx, time_idx)
-        nc.line_data = self.line_data.slice(line_idx, bus_idx, time_idx)
-        nc.transformer_data = self.transformer_data.slice(tr_idx, bus_idx, time_idx)
-        nc.hvdc_data = self.hvdc_data.slice(hvdc_idx, bus_idx, time_idx)
-        nc.vsc_data = self.vsc_data.slice(vsc_idx, bus_idx, time_idx)
-        nc.dc_line_data = self.dc_line_data.slice(dc_line_idx, bus_idx, time_idx)
-        nc.load_data = self.load_data.slice(load_idx, bus_idx, time_idx)
-        nc.static_generator_data = self.static_generator_data.slice(stagen_idx, bus_idx, time_idx)
-        nc.battery_data = self.battery_data.slice(batt_idx, bus_idx, time_idx)
-        nc.generator_data = self.generator_data.slice(gen_idx, bus_idx, time_idx)
-        nc.shunt_data = self.shunt_data.slice(shunt_idx, bus_idx, time_idx)
+        nc.branch_data = branch_data
+        nc.line_data = line_data
+        nc.transformer_data = transformer_data
+        nc.hvdc_data = hvdc_data
+        nc.vsc_data = vsc_data
+        nc.dc_line_data = dc_line_data
+        nc.load_data = load_data
+        nc.static_generator_data = static_generator_data
+        nc.battery_data = battery_data
+        nc.generator_data = generator_data
+        nc.shunt_data = shunt_data
+        nc.upfc_data = upfc_data
 
         return nc
 
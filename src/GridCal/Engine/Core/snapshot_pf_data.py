@@ -33,7 +33,7 @@ from GridCal.Engine.Devices.enumerations import TransformerControlType, Converte
 sparse_type = get_sparse_type()
 
 
-@nb.njit()
+@nb.njit(cache=True)
 def compose_generator_voltage_profile(nbus, ntime,
                                       gen_bus_indices, gen_vset, gen_status, gen_is_controlled,
                                       bat_bus_indices, bat_vset, bat_status, bat_is_controlled,
@@ -226,6 +226,10 @@ class SnapshotData:
         self.Yseries_ = None
         self.Yshunt_ = None
 
+        # real and imaginary parts of the admittances (for the OPF)
+        self.Ybus_split_ = None
+        self.Yseries_split_ = None
+
         # Admittances for Fast-Decoupled
         self.B1_ = None
         self.B2_ = None
@@ -240,6 +244,7 @@ class SnapshotData:
         self.pv_ = None
         self.vd_ = None
         self.pqpv_ = None
+        self.vdpv_ = None
         self.ac_ = None
         self.dc_ = None
 
@@ -897,6 +902,31 @@ class SnapshotData:
                                                                           Yshunt_bus=self.Yshunt_from_devices[:, 0])
         return self.Yseries_
 
+    @property
+    def Ybus_split(self):
+        """
+        Real and imaginary CSR parts of Ybus (G, B) with the same structure
+        """
+        Ybus = self.Ybus
+
+        # the taps modification replaces Ybus, so the split is only reused while it comes from the current matrix
+        if self.Ybus_split_ is None or self.Ybus_split_[0] is not Ybus:
+            self.Ybus_split_ = (Ybus,) + ycalc.split_sparse(Ybus)
+
+        return self.Ybus_split_[1:]
+
+    @property
+    def Yseries_split(self):
+        """
+        Real and imaginary CSR parts of Yseries (Gs, Bs) with the same structure
+        """
+        Yseries = self.Yseries
+
+        if self.Yseries_split_ is None or self.Yseries_split_[0] is not Yseries:
+            self.Yseries_split_ = (Yseries,) + ycalc.split_sparse(Yseries)
+
+        return self.Yseries_split_[1:]
+
     @property
     def Yshunt(self):
 
@@ -1006,6 +1036,16 @@ class SnapshotData:
 
         return self.pqpv_
 
+    @property
+    def vdpv(self):
+        """
+        Sorted indices of the slack and pv buses
+        """
+        if self.vdpv_ is None:
+            self.vdpv_ = np.sort(np.r_[self.vd, self.pv])
+
+        return self.vdpv_
+
     def compute_reactive_power_limits(self):
         """
         compute the reactive power limits in place
@@ -123,6 +123,36 @@ def get_elements_of_the_island(C_element_bus, island):
     return elm_idx
 
 
+def get_elements_of_the_island_mask(C_element_bus, bus_mask):
+    """
+    Get the element indices of the island from a boolean mask of its buses
+    This is a single sparse matrix-vector product, O(nnz), instead of a traversal per bus
+    :param C_element_bus: elements-buses connectivity matrix with the dimensions: elements x buses
+    :param bus_mask: boolean array (nbus) marking the buses of the island
+    :return: sorted array of indices of the elements connected to any of the island buses
+    """
+    return np.flatnonzero(C_element_bus * bus_mask.astype(int))
+
+
+def slice_by_buses(structure, C_element_bus, bus_idx, time_idx=None, bus_mask=None):
+    """
+    Get the elements of a device structure that belong to the island given by the bus indices,
+    and the structure sliced to them
+    :param structure: device structure (LoadData, BranchData, ...) implementing slice(elm_idx, bus_idx, time_idx)
+    :param C_element_bus: elements-buses connectivity matrix of the structure with the dimensions: elements x buses
+    :param bus_idx: array of bus indices of the island
+    :param time_idx: array of time indices (or None for all time indices)
+    :param bus_mask: boolean array (nbus) marking bus_idx, if precomputed (faster)
+    :return: array of element indices, sliced structure
+    """
+    if bus_mask is None:
+        elm_idx = get_elements_of_the_island(C_element_bus, bus_idx)
+    else:
+        elm_idx = get_elements_of_the_island_mask(C_element_bus, bus_mask)
+
+    return elm_idx, structure.slice(elm_idx, bus_idx, time_idx)
+
+
 def get_adjacency_matrix(C_branch_bus_f, C_branch_bus_t, branch_active, bus_active):
     """
     Compute the adjacency matrix
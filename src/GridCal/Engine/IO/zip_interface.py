@@ -13,10 +13,14 @@
 # You should have received a copy of the GNU General Public License
 # along with GridCal.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import StringIO, TextIOWrapper, BytesIO
+from io import StringIO, BytesIO
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import os
+import threading
+import time
 import numpy as np
-import chardet
 import pandas as pd
 import zipfile
 from typing import List, Dict
@@ -24,12 +28,116 @@ from GridCal.Engine.basic_structures import Logger
 from GridCal.Engine.IO.generic_io_functions import parse_config_df
 from GridCal.Gui.Session.session import SimulationSession
 
+try:
+    # C++ implementation, much faster than the pure python chardet
+    from cchardet import detect as detect_encoding
+except ImportError:
+    from chardet import detect as detect_encoding
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# bulky entries (profiles) are deflated at the fastest level, the small metadata tables at a higher level
+FAST_COMPRESS_LEVEL = 1
+METADATA_COMPRESS_LEVEL = 6
+
+
+def data_frame_to_csv_bytes(df: pd.DataFrame):
+    """
+    Serialize a DataFrame to csv (without index) using PyArrow's csv writer if available
+    :param df: pandas DataFrame
+    :return: csv content as a bytes-like object or string (pandas fallback)
+    """
+    if PYARROW_AVAILABLE:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            buffer = pa.BufferOutputStream()
+            pa_csv.write_csv(table, buffer)
+            return memoryview(buffer.getvalue())  # zero-copy view of the arrow buffer
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            # mixed-type object columns cannot be converted, use pandas
+            pass
+
+    with StringIO() as buffer:
+        df.to_csv(buffer, index=False)  # save the DataFrame to the buffer
+        return buffer.getvalue()
+
+
+def data_frame_to_parquet_bytes(df: pd.DataFrame):
+    """
+    Serialize a DataFrame (index included) to zstd-compressed parquet
+    :param df: pandas DataFrame
+    :return: parquet content as a bytes-like object
+    """
+    table = pa.Table.from_pandas(df)
+    buffer = pa.BufferOutputStream()
+    pq.write_table(table, buffer, compression='zstd')
+    return memoryview(buffer.getvalue())  # zero-copy view of the arrow buffer
+
+
+def serialize_data_frame(name: str, df: pd.DataFrame):
+    """
+    Serialize a DataFrame into the bytes to be stored in the zip file
+    :param name: name of the DataFrame
+    :param df: pandas DataFrame
+    :return: file name within the zip, content, compression type, compression level,
+             failed to use the binary format?
+    """
+    if name.endswith('_prof') and PYARROW_AVAILABLE:
+
+        try:  # try parquet, it is already compressed, so it is stored as is
+            return name + ".parquet", data_frame_to_parquet_bytes(df), zipfile.ZIP_STORED, None, False
+
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, ValueError):
+            # not representable in arrow (i.e. complex values), otherwise just use csv
+            return name + ".csv", data_frame_to_csv_bytes(df), zipfile.ZIP_DEFLATED, FAST_COMPRESS_LEVEL, True
+
+    elif name.endswith('_prof'):
+
+        # open a bytes buffer
+        try:  # try pickle
+            buffer = BytesIO()
+            # save the DataFrame to the buffer, protocol4 is to be compatible with python 3.6
+            df.to_pickle(buffer, protocol=4)
+            # the view keeps the buffer alive and avoids copying its content into a new bytes object
+            return name + ".pkl", buffer.getbuffer(), zipfile.ZIP_DEFLATED, FAST_COMPRESS_LEVEL, False
+
+        except:  # otherwise just use csv
+            return name + ".csv", data_frame_to_csv_bytes(df), zipfile.ZIP_DEFLATED, FAST_COMPRESS_LEVEL, True
+    else:
+        return name + ".csv", data_frame_to_csv_bytes(df), zipfile.ZIP_DEFLATED, METADATA_COMPRESS_LEVEL, False
+
+
+def to_session_array(arr):
+    """
+    Convert a results' array to something that np.save can store without pickle if possible
+    :param arr: array-like
+    :return: numpy array, needs pickle?
+    """
+    arr = np.array(arr)
+    if arr.dtype.hasobject:
+        if all(isinstance(x, str) for x in arr.flat):
+            # i.e. the arrays of names, stored as unicode arrays
+            return arr.astype(str), False
+        else:
+            # None, nan or mixed values must come back as they were
+            return arr, True
+    return arr, False
+
 
 def save_data_frames_to_zip(dfs: Dict[str, pd.DataFrame], filename_zip="file.zip",
                             text_func=None, progress_func=None,
                             sessions: List[SimulationSession] = []):
     """
     Save a list of DataFrames to a zip file without saving to disk the csv files
+    The DataFrames' serialization runs in a thread pool (pandas and pyarrow release the GIL while encoding),
+    while the zip entries are written sequentially in the original order. Only as many DataFrames as workers
+    are serialized ahead of the writer, so that the serialized bytes of all the frames are never held at once.
     :param dfs: dictionary of pandas dataFrames {name: DataFrame}
     :param filename_zip: file name where to save all
     :param text_func: pointer to function that prints the names
@@ -39,81 +147,106 @@ def save_data_frames_to_zip(dfs: Dict[str, pd.DataFrame], filename_zip="file.zip
 
     n = len(dfs)
     n_failed = 0
-    # open zip file for writing
-    with zipfile.ZipFile(filename_zip, 'w', zipfile.ZIP_DEFLATED) as f_zip_ptr:
 
-        # for each DataFrame and name...
-        i = 0
-        for name, df in dfs.items():
+    # forget the structure of the file that is about to be overwritten
+    _get_session_tree.cache_clear()
 
-            if text_func is not None:
-                text_func('Flushing ' + name + ' to ' + filename_zip + '...')
+    n_workers = os.cpu_count() or 1
 
-            if progress_func is not None:
-                progress_func((i + 1) / n * 100)
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
 
-            if name.endswith('_prof'):
-
-                # compose the csv file name
-                filename = name + ".pkl"
-
-                # open a string buffer
-                try:  # try pickle
-                    with BytesIO() as buffer:
-                        # save the DataFrame to the buffer, protocol4 is to be compatible with python 3.6
-                        df.to_pickle(buffer, protocol=4)
-                        # save the buffer to the zip file
-                        f_zip_ptr.writestr(filename, buffer.getvalue())
-
-                except:  # otherwise just use csv
-                    n_failed += 1
-                    filename = name + ".csv"
-                    with StringIO() as buffer:
-                        df.to_csv(buffer, index=False)  # save the DataFrame to the buffer
-                        f_zip_ptr.writestr(filename, buffer.getvalue())  # save the buffer to the zip file
-            else:
-                # compose the csv file name
-                filename = name + ".csv"
+        # launch the serialization of the first DataFrames, the rest are submitted as the entries are written
+        frames_to_submit = iter(dfs.items())
+        frame_futures = deque()
 
-                # open a string buffer
-                with StringIO() as buffer:
-                    df.to_csv(buffer, index=False)  # save the DataFrame to the buffer
-                    f_zip_ptr.writestr(filename, buffer.getvalue())  # save the buffer to the zip file
+        def submit_next_frame():
+            item = next(frames_to_submit, None)
+            if item is not None:
+                frame_futures.append((item[0], executor.submit(serialize_data_frame, item[0], item[1])))
 
-            i += 1
+        for _ in range(n_workers):
+            submit_next_frame()
 
-        # pre-count the sessions
-        n_items = 0
-        for session in sessions:
-            for drv_name, drv in session.drivers.items():
-                if hasattr(drv, 'results'):
-                    if drv.results is not None:
-                        for arr_name, arr in drv.results.get_arrays().items():
-                            n_items += 1
-
-        # save sessions
-        i = 0
+        # gather the sessions' arrays
+        session_arrays = list()
         for session in sessions:
             for drv_name, drv in session.drivers.items():
                 if hasattr(drv, 'results'):
                     if drv.results is not None:
                         for arr_name, arr in drv.results.get_arrays().items():
                             filename = 'sessions/' + session.name + '/' + drv.tpe.value + '/' + arr_name
+                            session_arrays.append((filename, arr))
+
+        n_items = len(session_arrays)
+
+        # open zip file for writing
+        with zipfile.ZipFile(filename_zip, 'w', zipfile.ZIP_DEFLATED,
+                             allowZip64=True, compresslevel=FAST_COMPRESS_LEVEL) as f_zip_ptr:
+
+            # for each DataFrame and name...
+            i = 0
+            while frame_futures:
+                name, future = frame_futures.popleft()
+
+                if text_func is not None:
+                    text_func('Flushing ' + name + ' to ' + filename_zip + '...')
+
+                if progress_func is not None:
+                    progress_func((i + 1) / n * 100)
+
+                filename, data, compress_type, compress_level, failed = future.result()
+                n_failed += failed
+
+                # keep the window of serializations in flight full
+                submit_next_frame()
+                i += 1
+
+                # save the data to the zip file
+                f_zip_ptr.writestr(filename, data, compress_type=compress_type, compresslevel=compress_level)
 
-                            if text_func is not None:
-                                text_func('Flushing ' + filename + ' to ' + filename_zip + '...')
+            # save sessions, the arrays are streamed straight into the zip entry to avoid an intermediate copy;
+            # binary arrays barely compress, so they are stored as they are
+            for i, (filename, arr) in enumerate(session_arrays):
 
-                            with BytesIO() as buffer:
-                                np.save(buffer, np.array(arr))  # save the DataFrame to the buffer
-                                f_zip_ptr.writestr(filename + '.npy', buffer.getvalue())  # save the buffer to the zip file
+                if text_func is not None:
+                    text_func('Flushing ' + filename + ' to ' + filename_zip + '...')
 
-                            if progress_func is not None:
-                                progress_func((i + 1) / n_items * 100)
+                zinfo = zipfile.ZipInfo(filename + '.npy', date_time=time.localtime()[:6])
+                zinfo.compress_type = zipfile.ZIP_STORED
 
-                            i += 1
+                arr, needs_pickle = to_session_array(arr)
+                with f_zip_ptr.open(zinfo, 'w', force_zip64=True) as zf:
+                    np.save(zf, arr, allow_pickle=needs_pickle)
+
+                if progress_func is not None:
+                    progress_func((i + 1) / n_items * 100)
 
     if n_failed:
-        print('Failed to pickle several profiles, but saved them as csv.\nFor improved speed install Pandas >= 1.2')
+        print('Failed to pickle several profiles, but saved them as csv.\n'
+              'For improved speed install Pandas >= 1.2 and PyArrow')
+
+
+@lru_cache(maxsize=8)
+def _get_session_tree(file_name_zip, mtime, size):
+    """
+    Get the sessions structure, memoized by file name and modification stamp
+    (only the parsed names are kept, the file is not left open)
+    :param file_name_zip: name of the zip file
+    :param mtime: modification time (ns) of the file
+    :param size: size of the file in bytes
+    :return: {session_name: {study_name: [array names]}}
+    """
+    with zipfile.ZipFile(file_name_zip) as zip_file_pointer:
+        names = zip_file_pointer.namelist()
+
+    data = defaultdict(lambda: defaultdict(list))
+
+    # names are sessions/session_name/study_name/array_name
+    for path in [name.split('/', 4) for name in names if name.startswith('sessions/')]:
+        if len(path) > 3:
+            data[path[1]][path[2]].append(path[3])
+
+    return {session_name: dict(studies) for session_name, studies in data.items()}
 
 
 def read_data_frame_from_zip(file_pointer, extension, index_col=None, logger=Logger()):
@@ -130,13 +263,21 @@ def read_data_frame_from_zip(file_pointer, extension, index_col=None, logger=Log
             return pd.read_csv(file_pointer, index_col=index_col)
         elif extension == '.pkl':
             try:
-                return pd.read_pickle(file_pointer)
+                # inflate the entry once into a seekable buffer: pandas seeks back to the start to retry
+                # with the compatibility unpickler, which on a zip entry stream means inflating it again
+                return pd.read_pickle(BytesIO(file_pointer.read()))
             except ValueError as e:
                 logger.add_error(str(e), device=file_pointer.name)
                 return None
             except AttributeError as e:
                 logger.add_error(str(e) + ' Upgrading pandas might help.', device=file_pointer.name)
                 return None
+        elif extension == '.parquet':
+            if PYARROW_AVAILABLE:
+                return pq.read_table(BytesIO(file_pointer.read())).to_pandas()
+            else:
+                logger.add_error('PyArrow is required to read parquet profiles', device=file_pointer.name)
+                return None
     except EOFError:
         return None
     except zipfile.BadZipFile:
@@ -159,36 +300,38 @@ def get_frames_from_zip(file_name_zip, text_func=None, progress_func=None, logge
     except zipfile.BadZipFile:
         return None
 
-    names = zip_file_pointer.namelist()
+    with zip_file_pointer:
 
-    n = len(names)
-    data = dict()
+        names = zip_file_pointer.namelist()
 
-    # for each file in the zip file...
-    for i, file_name in enumerate(names):
+        n = len(names)
+        data = dict()
 
-        # split the file name into name and extension
-        name, extension = os.path.splitext(file_name)
+        # for each file in the zip file...
+        for i, file_name in enumerate(names):
 
-        if text_func is not None:
-            text_func('Unpacking ' + name + ' from ' + file_name_zip)
+            # split the file name into name and extension
+            name, extension = os.path.splitext(file_name)
 
-        if progress_func is not None:
-            progress_func((i + 1) / n * 100)
+            if text_func is not None:
+                text_func('Unpacking ' + name + ' from ' + file_name_zip)
 
-        # create a buffer to read the file
-        file_pointer = zip_file_pointer.open(file_name)
+            if progress_func is not None:
+                progress_func((i + 1) / n * 100)
 
-        if name.lower() == "config":
-            df = read_data_frame_from_zip(file_pointer, extension, index_col=0, logger=logger)
-            data = parse_config_df(df, data)
-        else:
-            # make pandas read the file
-            df = read_data_frame_from_zip(file_pointer, extension, logger=logger)
+            # create a buffer to read the file
+            file_pointer = zip_file_pointer.open(file_name)
 
-        # append the DataFrame to the list
-        if df is not None:
-            data[name] = df
+            if name.lower() == "config":
+                df = read_data_frame_from_zip(file_pointer, extension, index_col=0, logger=logger)
+                data = parse_config_df(df, data)
+            else:
+                # make pandas read the file
+                df = read_data_frame_from_zip(file_pointer, extension, logger=logger)
+
+            # append the DataFrame to the list
+            if df is not None:
+                data[name] = df
 
     return data
 
@@ -200,32 +343,28 @@ def get_session_tree(file_name_zip: str):
     :return:
     """
     try:
-        zip_file_pointer = zipfile.ZipFile(file_name_zip)
+        stat = os.stat(file_name_zip)
+        data = _get_session_tree(file_name_zip, stat.st_mtime_ns, stat.st_size)
     except zipfile.BadZipFile:
         return dict()
 
-    names = zip_file_pointer.namelist()
-
-    data = dict()
-
-    for name in names:
-        if '/' in name:
-            path = name.split('/')
-            if path[0].lower() == 'sessions':
-
-                session_name = path[1]
-                study_name = path[2]
-                array_name = path[3]
+    # copy, since the cached structure must not be modified by the callers
+    return {session_name: {study_name: list(arrays) for study_name, arrays in studies.items()}
+            for session_name, studies in data.items()}
 
-                if session_name not in data.keys():
-                    data[session_name] = dict()
 
-                if study_name not in data[session_name].keys():
-                    data[session_name][study_name] = list()
-
-                data[session_name][study_name].append(array_name)
-
-    return data
+def read_session_array(zip_file_pointer: zipfile.ZipFile, name: str):
+    """
+    Read a .npy array straight from a zip entry stream
+    :param zip_file_pointer: ZipFile
+    :param name: name of the entry
+    :return: numpy array
+    """
+    try:
+        return np.lib.format.read_array(zip_file_pointer.open(name), allow_pickle=False)
+    except ValueError:
+        # files saved by older versions may contain pickled object arrays
+        return np.lib.format.read_array(zip_file_pointer.open(name), allow_pickle=True)
 
 
 def load_session_driver_objects(file_name_zip: str, session_name: str, study_name: str):
@@ -241,22 +380,37 @@ def load_session_driver_objects(file_name_zip: str, session_name: str, study_nam
     except zipfile.BadZipFile:
         return dict()
 
-    data = dict()
+    with zip_file_pointer:
+
+        # traverse the zip names and pick all those that start with sessions/session_name/study_name
+        prefix = 'sessions/' + session_name + '/' + study_name + '/'
+        items = list()
+        for name in zip_file_pointer.namelist():
+            if name.startswith(prefix):
+                arr_name = name[len(prefix):].split('/')[0]
+                if arr_name:
+                    items.append((arr_name.replace('.npy', ''), name))
+
+    # decode the arrays concurrently, every worker reads through its own ZipFile
+    # so that the reads do not contend for the lock of a shared file object
+    local = threading.local()
+    opened = list()
+
+    def read_item(item):
+        zip_ptr = getattr(local, 'zip_file_pointer', None)
+        if zip_ptr is None:
+            zip_ptr = zipfile.ZipFile(file_name_zip)
+            local.zip_file_pointer = zip_ptr
+            opened.append(zip_ptr)
+        return read_session_array(zip_ptr, item[1])
 
-    # traverse the zip names and pick all those that start with sessions/session_name/study_name
-    for name in zip_file_pointer.namelist():
-        if '/' in name:
-            path = name.split('/')
-            if len(path) > 3:
-                if path[0].lower() == 'sessions' and session_name == path[1] and study_name == path[2]:
-                    arr_name = path[3].replace('.npy', '')
-                    # create a buffer to read the file
-                    file_pointer = zip_file_pointer.open(name)
-
-                    try:
-                        data[arr_name] = np.load(file_pointer)
-                    except ValueError:
-                        data[arr_name] = np.load(file_pointer, allow_pickle=True)
+    try:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            arrays = executor.map(read_item, items)
+            data = {arr_name: arr for (arr_name, name), arr in zip(items, arrays)}
+    finally:
+        for zip_ptr in opened:
+            zip_ptr.close()
 
     return data
 
@@ -270,23 +424,38 @@ def get_xml_content(file_ptr):
     # xml files always have the encoding declared, find it out
     first_line = file_ptr.readline()
 
+    # read the rest of the file in one go and decode it once; the parsers work line by line
+    data = first_line + file_ptr.read()
+
+    # most grid files are pure ascii, that is checked in C and needs no encoding detection
+    is_ascii = data.isascii()
+
     if b'encoding' in first_line:
         encoding = first_line.split()[2].split(b'=')[1].replace(b'"', b'').replace(b'?>', b'').decode()
+    elif first_line.startswith(b'<?xml'):
+        # an xml declaration without encoding means utf-8 by the xml specification
+        encoding = 'utf-8'
+    elif is_ascii:
+        encoding = 'ascii'
     else:
         try:
-            detection = chardet.detect(first_line)
+            detection = detect_encoding(first_line)
             encoding = detection['encoding']
         except:
             encoding = 'utf-8'
 
-    # sequential back to the start
-    file_ptr.seek(0)
+    if not encoding:
+        # the detection may not come up with any encoding
+        encoding = 'utf-8'
+
+    if is_ascii and not encoding.lower().replace('_', '-').startswith(('utf-16', 'utf-32')):
+        # ascii is a subset of utf-8 and of the 8-bit encodings, and its decoder is the fastest
+        encoding = 'ascii'
 
-    # read all the lines
-    with TextIOWrapper(file_ptr, encoding=encoding) as fle:
-        text_lines = [l for l in fle]
+    text = data.decode(encoding)
 
-    return text_lines
+    # split the lines like the text readers do: universal newlines translated to \n, and nothing else
+    return StringIO(text, newline=None).readlines()
 
 
 def get_xml_from_zip(file_name_zip, text_func=None, progress_func=None):
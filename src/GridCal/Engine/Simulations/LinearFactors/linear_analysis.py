@@ -63,6 +63,40 @@ def make_ptdf(Bbus, Bf, pqpv, distribute_slack=True):
     return H
 
 
+@nb.njit(cache=True)
+def lodf_from_h(H, correct_values):
+    """
+    Compute the LODF matrix from the branch sensitivities H = PTDF x Cft^T in a single pass
+    :param H: branch to branch sensitivities matrix (branches, branches)
+    :param correct_values: clip the values to the [-1, 1] range?
+    :return: LODF matrix of dimensions (branches, branches)
+    """
+    nl = H.shape[0]
+    LODF = np.empty((nl, nl))
+
+    # the LODF column of the branches with 1 - H[j, j] = 0 is zero (avoids the divisions by zero)
+    div = np.empty(nl)
+    for j in range(nl):
+        div[j] = 1.0 - H[j, j]
+
+    for i in range(nl):
+        for j in range(nl):
+            if i == j:
+                LODF[i, j] = -1.0
+            elif div[j] != 0.0:
+                val = H[i, j] / div[j]
+                if correct_values:
+                    if val > 1.0:
+                        val = 1.0
+                    elif val < -1.0:
+                        val = -1.0
+                LODF[i, j] = val
+            else:
+                LODF[i, j] = 0.0
+
+    return LODF
+
+
 def make_lodf(Cf, Ct, PTDF, correct_values=True):
     """
     Compute the LODF matrix
@@ -71,48 +105,12 @@ def make_lodf(Cf, Ct, PTDF, correct_values=True):
     :param PTDF: PTDF matrix in numpy array form (branches, buses)
     :return: LODF matrix of dimensions (branches, branches)
     """
-    nl = PTDF.shape[0]
-
     # compute the connectivity matrix
     Cft = Cf - Ct
     H = PTDF * Cft.T
 
-    # old code
-    # h = sp.diags(H.diagonal())
-    # LODF = H / (np.ones((nl, nl)) - h * np.ones(nl))
-
-    # divide each row of H by the vector 1 - H.diagonal
-    # LODF = H / (1 - H.diagonal())
-    #
-    # # replace possible nan and inf
-    # LODF[LODF == -np.inf] = 0
-    # LODF[LODF == np.inf] = 0
-    # LODF = np.nan_to_num(LODF)
-
-    # this loop avoids the divisions by zero
-    # in those cases the LODF column should be zero
-    LODF = np.zeros((nl, nl))
-    div = 1 - H.diagonal()
-    for j in range(H.shape[1]):
-        if div[j] != 0:
-            LODF[:, j] = H[:, j] / div[j]
-
-    # replace the diagonal elements by -1
-    # old code
-    # LODF = LODF - sp.diags(LODF.diagonal()) - sp.eye(nl, nl), replaced by:
-    for i in range(nl):
-        LODF[i, i] = - 1.0
-
-    if correct_values:
-        i1, j1 = np.where(LODF > 1)
-        for i, j in zip(i1, j1):
-            LODF[i, j] = 1
-
-        i2, j2 = np.where(LODF < -1)
-        for i, j in zip(i2, j2):
-            LODF[i, j] = -1
-
-    return LODF
+    # divide each column of H by 1 - H.diagonal, set the diagonal to -1 and clip
+    return lodf_from_h(np.ascontiguousarray(H, dtype=float), correct_values)
 
 
 @nb.njit()
@@ -18,6 +18,8 @@ This file implements a DC-OPF for time series
 That means that solves the OPF problem for a complete time series at once
 """
 
+import numpy as np
+import scipy.sparse as sp
 from GridCal.Engine.Core.snapshot_opf_data import SnapshotOpfData
 from GridCal.Engine.Simulations.OPF.opf_templates import Opf, MIPSolvers
 from GridCal.ThirdParty.pulp import *
@@ -60,7 +62,7 @@ def set_fix_generation(problem, Pg, P_fix, enabled_for_dispatch):
     :return: Nothing
     """
 
-    idx = np.where(enabled_for_dispatch == False)[0]
+    idx = np.flatnonzero(~np.asarray(enabled_for_dispatch, dtype=bool))
 
     lpAddRestrictions2(problem=problem,
                        lhs=Pg[idx],
@@ -83,29 +85,50 @@ def get_power_injections(C_bus_gen, Pg, C_bus_bat, Pb, C_bus_load, PlSlack, QlSl
     :return: Power injection at the buses (n, nt)
     """
 
-    P = lpDot(C_bus_gen, Pg)
-
-    P += lpDot(C_bus_bat, Pb)
-
-    P -= lpDot(C_bus_load, Pl - PlSlack)
+    # all the devices in a single product, so that each bus injection is summed once
+    C_bus_dev = sp.hstack([C_bus_gen, C_bus_bat, -C_bus_load])
+    P = lpDot(C_bus_dev, np.concatenate((Pg, Pb, Pl - PlSlack)))
 
     Q = - lpDot(C_bus_load, Ql - QlSlack)
 
     return P, Q
 
 
-def add_ac_nodal_power_balance(numerical_circuit, problem: LpProblem, dvm, dva, P, Q):
+def get_fixed_voltage_increments_idx(calculation_inputs):
+    """
+    Get the buses whose voltage increments are zero: the angle of the slack buses
+    and the module of the slack and pv buses
+    :param calculation_inputs: list of islands (SnapshotOpfData)
+    :return: original indices of the slack buses, original indices of the slack and pv buses
+    """
+    vd = [np.zeros(0, dtype=int)]
+    vdpv = [np.zeros(0, dtype=int)]
+
+    for calc_inpt in calculation_inputs:
+        if len(calc_inpt.vd) > 0:
+            bus_original_idx = np.array(calc_inpt.original_bus_idx)
+            vd.append(bus_original_idx[calc_inpt.vd])
+            vdpv.append(bus_original_idx[calc_inpt.vdpv])
+
+    return np.concatenate(vd), np.concatenate(vdpv)
+
+
+def add_ac_nodal_power_balance(numerical_circuit, problem: LpProblem, dvm, dva, P, Q, calculation_inputs=None):
     """
     Add the nodal power balance
     :param numerical_circuit: NumericalCircuit instance
     :param problem: LpProblem instance
-    :param dva: Voltage angles LpVars (n, nt)
+    :param dvm: Voltage module increments LpVars (n, nt), with zeros at the slack and pv entries
+    :param dva: Voltage angles LpVars (n, nt), with zeros at the slack entries
     :param P: Power injection at the buses LpVars (n, nt)
+    :param Q: Reactive power injection at the buses LpVars (n, nt)
+    :param calculation_inputs: list of islands, if None they are computed here
     :return: Nothing, the restrictions are added to the problem
     """
 
     # do the topological computation
-    calculation_inputs = numerical_circuit.split_into_islands()
+    if calculation_inputs is None:
+        calculation_inputs = numerical_circuit.split_into_islands()
 
     nodal_restrictions_P = np.empty(numerical_circuit.nbus, dtype=object)
     nodal_restrictions_Q = np.empty(numerical_circuit.nbus, dtype=object)
@@ -123,23 +146,21 @@ def add_ac_nodal_power_balance(numerical_circuit, problem: LpProblem, dvm, dva,
             dva_island = dva[bus_original_idx]  # the sizes already reflect the correct time span
             dvm_island = dvm[bus_original_idx]  # the sizes already reflect the correct time span
 
-            B_island = calc_inpt.Ybus.imag
-            G_island = calc_inpt.Ybus.real
-            Bs_island = calc_inpt.Yseries.imag
-            Gs_island = calc_inpt.Yseries.real
+            # CSR real and imaginary parts sharing the structure, cached on the circuit across formulations
+            G_island, B_island = calc_inpt.Ybus_split
+            Gs_island, Bs_island = calc_inpt.Yseries_split
 
             pqpv = calc_inpt.pqpv
             pq = calc_inpt.pq
             pv = calc_inpt.pv
             vd = calc_inpt.vd
-            vdpv = np.r_[vd, pv]
-            vdpv.sort()
+            vdpv = calc_inpt.vdpv
 
             # Add nodal real power balance for the non slack nodes
             idx = bus_original_idx[pqpv]
             nodal_restrictions_P[idx] = lpAddRestrictions2(problem=problem,
-                                                           lhs=-lpDot(Bs_island[np.ix_(pqpv, pqpv)], dva_island[pqpv])
-                                                               + lpDot(G_island[np.ix_(pqpv, pq)], dvm_island[pq]),
+                                                           lhs=-lpDotSubMatrix(Bs_island, pqpv, pqpv, dva_island)
+                                                               + lpDotSubMatrix(G_island, pqpv, pq, dvm_island),
                                                            rhs=P_island[pqpv],
                                                            name='Nodal_real_power_balance_pqpv_is' + str(i),
                                                            op='=')
@@ -147,35 +168,25 @@ def add_ac_nodal_power_balance(numerical_circuit, problem: LpProblem, dvm, dva,
             # Add nodal reactive power balance for the non slack nodes
             idx = bus_original_idx[pq]
             nodal_restrictions_Q[idx] = lpAddRestrictions2(problem=problem,
-                                                           lhs=-lpDot(Gs_island[np.ix_(pq, pqpv)], dva_island[pqpv])
-                                                               - lpDot(B_island[np.ix_(pq, pq)], dvm_island[pq]),
+                                                           lhs=-lpDotSubMatrix(Gs_island, pq, pqpv, dva_island)
+                                                               - lpDotSubMatrix(B_island, pq, pq, dvm_island),
                                                            rhs=Q_island[pq],
                                                            name='Nodal_imag_power_balance_pqpv_is' + str(i),
                                                            op='=')
 
+            # the slack angles and the slack and pv modules are zero, so their columns are skipped
+            free_va = np.setdiff1d(np.arange(len(bus_original_idx)), vd)
+            free_vm = np.setdiff1d(np.arange(len(bus_original_idx)), vdpv)
+
             # Add nodal real power balance for the slack nodes
             idx = bus_original_idx[vd]
             nodal_restrictions_P[idx] = lpAddRestrictions2(problem=problem,
-                                                           lhs=-lpDot(Bs_island[vd, :], dva_island)
-                                                               + lpDot(G_island[vd, :], dvm_island),
+                                                           lhs=-lpDotSubMatrix(Bs_island, vd, free_va, dva_island)
+                                                               + lpDotSubMatrix(G_island, vd, free_vm, dvm_island),
                                                            rhs=P_island[vd],
                                                            name='Nodal_real_power_balance_vd_is' + str(i),
                                                            op='=')
 
-            # delta of voltage angles equal to zero for the slack nodes (vd)
-            lpAddRestrictions2(problem=problem,
-                               lhs=dva_island[vd],
-                               rhs=np.zeros_like(dva_island[vd]),
-                               name='dVa_vd_zero_is' + str(i),
-                               op='=')
-
-            # delta of voltage module equal to zero for the slack and pv nodes (vdpv)
-            lpAddRestrictions2(problem=problem,
-                               lhs=dvm_island[vdpv],
-                               rhs=np.zeros_like(dva_island[vdpv]),
-                               name='dVm_vdpv_zero_is' + str(i),
-                               op='=')
-
     return nodal_restrictions_P, nodal_restrictions_Q
 
 
@@ -271,11 +282,18 @@ class OpfAc(Opf):
         load_slack = lpMakeVars(name='LSlack', shape=nl, lower=0, upper=None)
         dva = lpMakeVars(name='dva', shape=n, lower=-3.14, upper=3.14)
         dvm = lpMakeVars(name='dvm', shape=n, lower=0, upper=2)
-        theta_f = dva[numerical_circuit.F]
-        theta_t = dva[numerical_circuit.T]
         branch_rating_slack1 = lpMakeVars(name='FSlack1', shape=m, lower=0, upper=None)
         branch_rating_slack2 = lpMakeVars(name='FSlack2', shape=m, lower=0, upper=None)
 
+        # the delta of voltage angles of the slack nodes (vd) and the delta of voltage module of the slack and pv
+        # nodes (vdpv) are zero: their variables are replaced by zeros instead of adding equality restrictions
+        calculation_inputs = numerical_circuit.split_into_islands()
+        vd, vdpv = get_fixed_voltage_increments_idx(calculation_inputs)
+        dva[vd] = 0
+        dvm[vdpv] = 0
+        theta_f = dva[numerical_circuit.F]
+        theta_t = dva[numerical_circuit.T]
+
         # declare problem
         problem = LpProblem(name='AC_OPF')
 
@@ -296,7 +314,8 @@ class OpfAc(Opf):
         # compute the nodal power balance restrictions
         nodal_restrictions_P, nodal_restrictions_Q = add_ac_nodal_power_balance(numerical_circuit=numerical_circuit,
                                                                                 problem=problem,
-                                                                                dvm=dvm, dva=dva, P=P, Q=Q)
+                                                                                dvm=dvm, dva=dva, P=P, Q=Q,
+                                                                                calculation_inputs=calculation_inputs)
 
         # add the branch loading restriction
         load_f, load_t = add_branch_loading_restriction(problem, theta_f, theta_t, Bseries, branch_ratings,
@@ -18,6 +18,8 @@ This file implements a DC-OPF for time series
 That means that solves the OPF problem for a complete time series at once
 """
 
+import numpy as np
+import scipy.sparse as sp
 from GridCal.Engine.basic_structures import MIPSolvers
 from GridCal.Engine.Core.time_series_opf_data import OpfTimeCircuit
 from GridCal.Engine.Simulations.OPF.opf_templates import OpfTimeSeries
@@ -41,13 +43,14 @@ def add_objective_function(Pg, Pb, LSlack, FSlack1, FSlack2,
     :return: Nothing, just assign the objective function
     """
 
-    f_obj = lpSum(cost_g * Pg)
+    # the (n, nt) arrays are flattened so that the products and the sums run over a single contiguous sequence
+    f_obj = lpSum(cost_g.ravel() * Pg.ravel())
 
-    f_obj += lpSum(cost_b * Pb)
+    f_obj += lpSum(cost_b.ravel() * Pb.ravel())
 
-    f_obj += lpSum(cost_l * LSlack)
+    f_obj += lpSum(cost_l.ravel() * LSlack.ravel())
 
-    f_obj += lpSum(cost_br * (FSlack1 + FSlack2))
+    f_obj += lpSum(cost_br.ravel() * (FSlack1 + FSlack2).ravel())
 
     return f_obj
 
@@ -62,7 +65,7 @@ def set_fix_generation(problem, Pg, P_profile, enabled_for_dispatch):
     :return: Nothing
     """
 
-    idx = np.where(enabled_for_dispatch == False)[0]
+    idx = np.flatnonzero(~np.asarray(enabled_for_dispatch, dtype=bool))
 
     lpAddRestrictions2(problem=problem,
                        lhs=Pg[idx, :],
@@ -86,29 +89,50 @@ def get_power_injections(C_bus_gen, Pg, C_bus_bat, Pb, C_bus_load, PlSlack, QlSl
     :return: Power injection at the buses (n, nt)
     """
 
-    P = lpDot(C_bus_gen, Pg)
-
-    P += lpDot(C_bus_bat, Pb)
-
-    P -= lpDot(C_bus_load, Pl - PlSlack)
+    # all the devices in a single product, so that each bus injection is summed once
+    C_bus_dev = sp.hstack([C_bus_gen, C_bus_bat, -C_bus_load])
+    P = lpDot(C_bus_dev, np.concatenate((Pg, Pb, Pl - PlSlack)))
 
     Q = - lpDot(C_bus_load, Ql - QlSlack)
 
     return P, Q
 
 
-def add_ac_nodal_power_balance(numerical_circuit: OpfTimeCircuit, problem: LpProblem, dvm, dva, P, Q, start_, end_):
+def get_fixed_voltage_increments_idx(calc_inputs):
+    """
+    Get the buses whose voltage increments are zero: the angle of the slack buses
+    and the module of the slack and pv buses
+    :param calc_inputs: list of islands (OpfTimeCircuit)
+    :return: original indices of the slack buses, original indices of the slack and pv buses
+    """
+    vd = [np.zeros(0, dtype=int)]
+    vdpv = [np.zeros(0, dtype=int)]
+
+    for calc_inpt in calc_inputs:
+        bus_original_idx = np.array(calc_inpt.original_bus_idx)
+        vd.append(bus_original_idx[calc_inpt.vd])
+        vdpv.append(bus_original_idx[calc_inpt.vdpv])
+
+    return np.concatenate(vd), np.concatenate(vdpv)
+
+
+def add_ac_nodal_power_balance(numerical_circuit: OpfTimeCircuit, problem: LpProblem, dvm, dva, P, Q, start_, end_,
+                               calc_inputs=None):
     """
     Add the nodal power balance
     :param numerical_circuit: NumericalCircuit instance
     :param problem: LpProblem instance
-    :param dva: Voltage angles LpVars (n, nt)
+    :param dvm: Voltage module increments LpVars (n, nt), with zeros at the slack and pv entries
+    :param dva: Voltage angles LpVars (n, nt), with zeros at the slack entries
     :param P: Power injection at the buses LpVars (n, nt)
+    :param Q: Reactive power injection at the buses LpVars (n, nt)
+    :param calc_inputs: list of islands, if None they are computed here
     :return: Nothing, the restrictions are added to the problem
     """
 
     # do the topological computation
-    calc_inputs = numerical_circuit.split_into_islands()
+    if calc_inputs is None:
+        calc_inputs = numerical_circuit.split_into_islands()
 
     # generate the time indices to simulate
     if end_ == -1:
@@ -128,23 +152,21 @@ def add_ac_nodal_power_balance(numerical_circuit: OpfTimeCircuit, problem: LpPro
         Q_island = Q[bus_original_idx, :]  # the sizes already reflect the correct time span
         dva_island = dva[bus_original_idx, :]  # the sizes already reflect the correct time span
         dvm_island = dvm[bus_original_idx, :]  # the sizes already reflect the correct time span
-        B_island = calc_inpt.Ybus.imag
-        G_island = calc_inpt.Ybus.real
-        Bs_island = calc_inpt.Yseries.imag
-        Gs_island = calc_inpt.Yseries.real
+        # CSR real and imaginary parts sharing the structure, cached on the circuit across formulations
+        G_island, B_island = calc_inpt.Ybus_split
+        Gs_island, Bs_island = calc_inpt.Yseries_split
 
         pqpv = calc_inpt.pqpv
         pq = calc_inpt.pq
         pv = calc_inpt.pv
         vd = calc_inpt.vd
-        vdpv = np.r_[vd, pv]
-        vdpv.sort()
+        vdpv = calc_inpt.vdpv
 
         # Add nodal real power balance for the non slack nodes
         idx = bus_original_idx[pqpv]
         nodal_restrictions_P[idx] = lpAddRestrictions2(problem=problem,
-                                                       lhs=-lpDot(Bs_island[np.ix_(pqpv, pqpv)], dva_island[pqpv, :])
-                                                           + lpDot(G_island[np.ix_(pqpv, pq)], dvm_island[pq, :]),
+                                                       lhs=-lpDotSubMatrix(Bs_island, pqpv, pqpv, dva_island)
+                                                           + lpDotSubMatrix(G_island, pqpv, pq, dvm_island),
                                                        rhs=P_island[pqpv, :],
                                                        name='Nodal_real_power_balance_pqpv_is' + str(i),
                                                        op='=')
@@ -152,67 +174,61 @@ def add_ac_nodal_power_balance(numerical_circuit: OpfTimeCircuit, problem: LpPro
         # Add nodal reactive power balance for the non slack nodes
         idx = bus_original_idx[pq]
         nodal_restrictions_Q[idx] = lpAddRestrictions2(problem=problem,
-                                                       lhs=-lpDot(Gs_island[np.ix_(pq, pqpv)], dva_island[pqpv, :])
-                                                           - lpDot(B_island[np.ix_(pq, pq)], dvm_island[pq, :]),
+                                                       lhs=-lpDotSubMatrix(Gs_island, pq, pqpv, dva_island)
+                                                           - lpDotSubMatrix(B_island, pq, pq, dvm_island),
                                                        rhs=Q_island[pq, :],
                                                        name='Nodal_imag_power_balance_pqpv_is' + str(i),
                                                        op='=')
 
+        # the slack angles and the slack and pv modules are zero, so their columns are skipped
+        free_va = np.setdiff1d(np.arange(len(bus_original_idx)), vd)
+        free_vm = np.setdiff1d(np.arange(len(bus_original_idx)), vdpv)
+
         # Add nodal real power balance for the slack nodes
         idx = bus_original_idx[vd]
         nodal_restrictions_P[idx] = lpAddRestrictions2(problem=problem,
-                                                       lhs=-lpDot(Bs_island[vd, :], dva_island)
-                                                           + lpDot(G_island[vd, :], dvm_island),
+                                                       lhs=-lpDotSubMatrix(Bs_island, vd, free_va, dva_island)
+                                                           + lpDotSubMatrix(G_island, vd, free_vm, dvm_island),
                                                        rhs=P_island[vd, :],
                                                        name='Nodal_real_power_balance_vd_is' + str(i),
                                                        op='=')
 
-        # delta of voltage angles equal to zero for the slack nodes (vd)
-        lpAddRestrictions2(problem=problem,
-                           lhs=dva_island[vd, :],
-                           rhs=np.zeros_like(dva_island[vd, :]),
-                           name='dVa_vd_zero_is' + str(i),
-                           op='=')
-
-        # delta of voltage module equal to zero for the slack and pv nodes (vdpv)
-        lpAddRestrictions2(problem=problem,
-                           lhs=dvm_island[vdpv, :],
-                           rhs=np.zeros_like(dva_island[vdpv, :]),
-                           name='dVm_vdpv_zero_is' + str(i),
-                           op='=')
-
     return nodal_restrictions_P, nodal_restrictions_Q
 
 
 def add_branch_loading_restriction(problem: LpProblem,
                                    theta_f, theta_t, Bseries,
-                                   Fmax, FSlack1, FSlack2):
+                                   Fmax, FSlack1, FSlack2, active_idx=None):
     """
     Add the branch loading restrictions
     :param problem: LpProblem instance
     :param theta_f: voltage angles at the "from" side of the branches (m, nt)
     :param theta_t: voltage angles at the "to" side of the branches (m, nt)
-    :param Bseries: Array of branch susceptances (m)
+    :param Bseries: Array of branch susceptances (m, nt)
     :param Fmax: Array of branch ratings (m, nt)
     :param FSlack1: Array of branch loading slack variables in the from-to sense
     :param FSlack2: Array of branch loading slack variables in the to-from sense
+    :param active_idx: indices of the branches to restrict (None for all), the flow of the rest is zero anyway
     :return: Nothing
     """
 
     load_f = Bseries * (theta_f - theta_t)
     load_t = Bseries * (theta_t - theta_f)
 
+    if active_idx is None:
+        active_idx = np.arange(load_f.shape[0])
+
     # from-to branch power restriction
     lpAddRestrictions2(problem=problem,
-                       lhs=load_f,
-                       rhs=np.array([Fmax[:, i] + FSlack1[:, i] for i in range(FSlack1.shape[1])]).transpose(),  # Fmax + FSlack1
+                       lhs=load_f[active_idx, :],
+                       rhs=Fmax[active_idx, :] + FSlack1[active_idx, :],
                        name='from_to_branch_rate',
                        op='<=')
 
     # to-from branch power restriction
     lpAddRestrictions2(problem=problem,
-                       lhs=load_t,
-                       rhs=np.array([Fmax[:, i] + FSlack2[:, i] for i in range(FSlack2.shape[1])]).transpose(),  # Fmax + FSlack2
+                       lhs=load_t[active_idx, :],
+                       rhs=Fmax[active_idx, :] + FSlack2[active_idx, :],
                        name='to_from_branch_rate',
                        op='<=')
 
@@ -244,17 +260,13 @@ def add_battery_discharge_restriction(problem: LpProblem, SoC0, Capacity, Effici
     # compute the inverse of he efficiency because pulp does not divide by floats
     eff_inv = 1 / Efficiency
 
-    # set the Energy values for t=1:nt
-    for i in range(len(dt) - 1):
-
-        t = i + 1
-
-        # set the energy value Et = E(t-1) + dt * Pb / eff
-        lpAddRestrictions2(problem=problem,
-                           lhs=E[:, t],
-                           rhs=E[:, t-1] - dt[i] * Pb[:, t] * eff_inv,
-                           name='initial_soc_t' + str(t) + '_',
-                           op='=')
+    # set the Energy values for t=1:nt at once: Et = E(t-1) + dt * Pb / eff
+    nt = len(dt)
+    lpAddRestrictions2(problem=problem,
+                       lhs=E[:, 1:nt],
+                       rhs=E[:, :nt - 1] - dt[:nt - 1] * Pb[:, 1:nt] * np.reshape(eff_inv, (-1, 1)),
+                       name='soc_t',
+                       op='=')
 
 
 class OpfAcTimeSeries(OpfTimeSeries):
@@ -329,13 +341,15 @@ class OpfAcTimeSeries(OpfTimeSeries):
         # branch
         branch_ratings = numerical_circuit.branch_rates[:, a:b] / Sbase
         ys = 1 / (numerical_circuit.branch_R + 1j * numerical_circuit.branch_X)
-        Bseries = (numerical_circuit.branch_active[:, a:b].T * ys.imag).T
+        branch_active = numerical_circuit.branch_active[:, a:b]
+        Bseries = ys.imag[:, np.newaxis] * branch_active
+        active_branches = np.flatnonzero(branch_active.any(axis=1))
         cost_br = numerical_circuit.branch_cost[:, a:b]
 
         # Compute time delta in hours
         dt = np.zeros(nt)  # here nt = end_idx - start_idx
-        for t in range(1, nt):
-            dt[t - 1] = (numerical_circuit.time_array[a + t] - numerical_circuit.time_array[a + t - 1]).seconds / 3600
+        time_array = np.asarray(numerical_circuit.time_array[a:b], dtype='datetime64[s]')
+        dt[:nt - 1] = np.diff(time_array).astype(float) / 3600
 
         # create LP variables
         Pg = lpMakeVars(name='Pg', shape=(ng, nt), lower=Pg_min, upper=Pg_max)
@@ -344,11 +358,18 @@ class OpfAcTimeSeries(OpfTimeSeries):
         load_slack = lpMakeVars(name='LSlack', shape=(nl, nt), lower=0, upper=None)
         dva = lpMakeVars(name='dva', shape=(n, nt), lower=-3.14, upper=3.14)
         dvm = lpMakeVars(name='dvm', shape=(n, nt), lower=0, upper=2)
-        theta_f = dva[numerical_circuit.F, :]
-        theta_t = dva[numerical_circuit.T, :]
         branch_rating_slack1 = lpMakeVars(name='FSlack1', shape=(m, nt), lower=0, upper=None)
         branch_rating_slack2 = lpMakeVars(name='FSlack2', shape=(m, nt), lower=0, upper=None)
 
+        # the delta of voltage angles of the slack nodes (vd) and the delta of voltage module of the slack and pv
+        # nodes (vdpv) are zero: their variables are replaced by zeros instead of adding equality restrictions
+        calc_inputs = numerical_circuit.split_into_islands()
+        vd, vdpv = get_fixed_voltage_increments_idx(calc_inputs)
+        dva[vd, :] = 0
+        dvm[vdpv, :] = 0
+        theta_f = dva[numerical_circuit.F, :]
+        theta_t = dva[numerical_circuit.T, :]
+
         # declare problem
         problem = LpProblem(name='AC_OPF_Time_Series')
 
@@ -371,10 +392,12 @@ class OpfAcTimeSeries(OpfTimeSeries):
         nodal_restrictions_P, nodal_restrictions_Q = add_ac_nodal_power_balance(numerical_circuit=numerical_circuit,
                                                                                 problem=problem,
                                                                                 dvm=dvm, dva=dva, P=P, Q=Q,
-                                                                                start_=self.start_idx, end_=self.end_idx)
+                                                                                start_=self.start_idx, end_=self.end_idx,
+                                                                                calc_inputs=calc_inputs)
 
         load_f, load_t = add_branch_loading_restriction(problem, theta_f, theta_t, Bseries, branch_ratings,
-                                                        branch_rating_slack1, branch_rating_slack2)
+                                                        branch_rating_slack1, branch_rating_slack2,
+                                                        active_idx=active_branches)
 
         # if there are batteries, add the batteries
         if nb > 0:
@@ -18,6 +18,7 @@ This file implements a DC-OPF for time series
 That means that solves the OPF problem for a complete time series at once
 """
 import numpy as np
+import scipy.sparse as sp
 import GridCal.ThirdParty.pulp as pl
 # from GridCal.Engine.Core.snapshot_opf_data import SnapshotOpfData
 from GridCal.Engine.Simulations.OPF.opf_templates import Opf, MIPSolvers
@@ -60,7 +61,7 @@ def set_fix_generation(problem, Pg, P_fix, enabled_for_dispatch):
     :return: Nothing
     """
 
-    idx = np.where(enabled_for_dispatch == False)[0]
+    idx = np.flatnonzero(~np.asarray(enabled_for_dispatch, dtype=bool))
 
     pl.lpAddRestrictions2(problem=problem,
                           lhs=Pg[idx],
@@ -82,7 +83,9 @@ def get_power_injections(C_bus_gen, Pg, C_bus_bat, Pb, C_bus_load, LSlack, Pl):
     :return: Power injection at the buses (n, nt)
     """
 
-    return pl.lpDot(C_bus_gen, Pg) + pl.lpDot(C_bus_bat, Pb) - pl.lpDot(C_bus_load, Pl - LSlack)
+    # all the devices in a single product, so that each bus injection is summed once
+    C_bus_dev = sp.hstack([C_bus_gen, C_bus_bat, -C_bus_load])
+    return pl.lpDot(C_bus_dev, np.concatenate((Pg, Pb, Pl - LSlack)))
 
 
 def add_dc_nodal_power_balance(numerical_circuit, problem: pl.LpProblem, theta, P):
@@ -121,7 +124,7 @@ def add_dc_nodal_power_balance(numerical_circuit, problem: pl.LpProblem, theta,
             # Add nodal power balance for the non slack nodes
             idx = bus_original_idx[pqpv]
             nodal_restrictions[idx] = pl.lpAddRestrictions2(problem=problem,
-                                                            lhs=pl.lpDot(B_island[np.ix_(pqpv, pqpv)], theta_island[pqpv]),
+                                                            lhs=pl.lpDotSubMatrix(B_island, pqpv, pqpv, theta_island),
                                                             rhs=P_island[pqpv],
                                                             name='Nodal_power_balance_pqpv_is' + str(i),
                                                             op='=')
@@ -129,7 +132,7 @@ def add_dc_nodal_power_balance(numerical_circuit, problem: pl.LpProblem, theta,
             # Add nodal power balance for the slack nodes
             idx = bus_original_idx[vd]
             nodal_restrictions[idx] = pl.lpAddRestrictions2(problem=problem,
-                                                            lhs=pl.lpDot(B_island[vd, :], theta_island),
+                                                            lhs=pl.lpDotSubMatrix(B_island, vd, None, theta_island),
                                                             rhs=P_island[vd],
                                                             name='Nodal_power_balance_vd_is' + str(i),
                                                             op='=')
@@ -137,7 +140,7 @@ def add_dc_nodal_power_balance(numerical_circuit, problem: pl.LpProblem, theta,
             # slack angles equal to zero
             pl.lpAddRestrictions2(problem=problem,
                                   lhs=theta_island[vd],
-                                  rhs=np.zeros(len(vd)),
+                                  rhs=0,
                                   name='Theta_vd_zero_is' + str(i),
                                   op='=')
 
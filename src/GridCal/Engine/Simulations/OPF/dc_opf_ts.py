@@ -17,6 +17,8 @@
 This file implements a DC-OPF for time series
 That means that solves the OPF problem for a complete time series at once
 """
+import numpy as np
+import scipy.sparse as sp
 from GridCal.Engine.Simulations.OPF.opf_templates import OpfTimeSeries
 from GridCal.Engine.basic_structures import MIPSolvers
 from GridCal.Engine.Core.time_series_opf_data import OpfTimeCircuit
@@ -40,13 +42,14 @@ def get_objective_function(Pg, Pb, LSlack, FSlack1, FSlack2,
     :return: Nothing, just assign the objective function
     """
 
-    f_obj = lpSum(cost_g * Pg)
+    # the (n, nt) arrays are flattened so that the products and the sums run over a single contiguous sequence
+    f_obj = lpSum(cost_g.ravel() * Pg.ravel())
 
-    f_obj += lpSum(cost_b * Pb)
+    f_obj += lpSum(cost_b.ravel() * Pb.ravel())
 
-    f_obj += lpSum(cost_l * LSlack)
+    f_obj += lpSum(cost_l.ravel() * LSlack.ravel())
 
-    f_obj += lpSum(cost_br * (FSlack1 + FSlack2))
+    f_obj += lpSum(cost_br.ravel() * (FSlack1 + FSlack2).ravel())
 
     return f_obj
 
@@ -61,7 +64,7 @@ def set_fix_generation(problem, Pg, P_profile, enabled_for_dispatch):
     :return: Nothing
     """
 
-    idx = np.where(enabled_for_dispatch == False)[0]
+    idx = np.flatnonzero(~np.asarray(enabled_for_dispatch, dtype=bool))
 
     lpAddRestrictions2(problem=problem,
                        lhs=Pg[idx, :],
@@ -84,11 +87,9 @@ def get_power_injections(C_bus_gen, Pg, C_bus_bat, Pb, C_bus_load, LSlack, Pl):
     :return: Power injection at the buses (n, nt)
     """
 
-    P = lpDot(C_bus_gen, Pg)
-
-    P += lpDot(C_bus_bat, Pb)
-
-    P -= lpDot(C_bus_load, Pl - LSlack)
+    # all the devices in a single product, so that each bus injection is summed once
+    C_bus_dev = sp.hstack([C_bus_gen, C_bus_bat, -C_bus_load])
+    P = lpDot(C_bus_dev, np.concatenate((Pg, Pb, Pl - LSlack)))
 
     return P
 
@@ -129,7 +130,7 @@ def add_dc_nodal_power_balance(numerical_circuit: OpfTimeCircuit, problem: LpPro
         # Add nodal power balance for the non slack nodes
         idx = bus_original_idx[pqpv]
         nodal_restrictions[idx] = lpAddRestrictions2(problem=problem,
-                                                     lhs=lpDot(B_island[np.ix_(pqpv, pqpv)], theta_island[pqpv, :]),
+                                                     lhs=lpDotSubMatrix(B_island, pqpv, pqpv, theta_island),
                                                      rhs=P_island[pqpv, :],
                                                      name='Nodal_power_balance_pqpv_is' + str(i),
                                                      op='=')
@@ -137,7 +138,7 @@ def add_dc_nodal_power_balance(numerical_circuit: OpfTimeCircuit, problem: LpPro
         # Add nodal power balance for the slack nodes
         idx = bus_original_idx[vd]
         nodal_restrictions[idx] = lpAddRestrictions2(problem=problem,
-                                                     lhs=lpDot(B_island[vd, :], theta_island),
+                                                     lhs=lpDotSubMatrix(B_island, vd, None, theta_island),
                                                      rhs=P_island[vd, :],
                                                      name='Nodal_power_balance_vd_is' + str(i),
                                                      op='=')
@@ -145,7 +146,7 @@ def add_dc_nodal_power_balance(numerical_circuit: OpfTimeCircuit, problem: LpPro
         # slack angles equal to zero
         lpAddRestrictions2(problem=problem,
                            lhs=theta_island[vd, :],
-                           rhs=np.zeros_like(theta_island[vd, :]),
+                           rhs=0,
                            name='Theta_vd_zero_is' + str(i),
                            op='=')
 
@@ -154,27 +155,29 @@ def add_dc_nodal_power_balance(numerical_circuit: OpfTimeCircuit, problem: LpPro
 
 def add_branch_loading_restriction(problem: LpProblem,
                                    theta_f, theta_t, Bseries,
-                                   ratings, ratings_slack_from, ratings_slack_to):
+                                   ratings, ratings_slack_from, ratings_slack_to, active_idx=None):
     """
     Add the branch loading restrictions
     :param problem: LpProblem instance
     :param theta_f: voltage angles at the "from" side of the branches (m, nt)
     :param theta_t: voltage angles at the "to" side of the branches (m, nt)
-    :param Bseries: Array of branch susceptances (m)
+    :param Bseries: Array of branch susceptances (m, nt)
     :param ratings: Array of branch ratings (m, nt)
     :param ratings_slack_from: Array of branch loading slack variables in the from-to sense
     :param ratings_slack_to: Array of branch loading slack variables in the to-from sense
+    :param active_idx: indices of the branches to restrict (None for all), the flow of the rest is zero anyway
     :return: Nothing
     """
-    m = ratings_slack_to.shape[1]
-
     # from-to branch power restriction
     load_f = Bseries * (theta_f - theta_t)
 
+    if active_idx is None:
+        active_idx = np.arange(load_f.shape[0])
+
     lpAddRestrictions3(problem=problem,
-                       lhs=np.array([-ratings[:, i] - ratings_slack_to[:, i] for i in range(m)]).transpose(),
-                       var=load_f,
-                       rhs=np.array([ratings[:, i] + ratings_slack_from[:, i] for i in range(m)]).transpose(),
+                       lhs=-ratings[active_idx, :] - ratings_slack_to[active_idx, :],
+                       var=load_f[active_idx, :],
+                       rhs=ratings[active_idx, :] + ratings_slack_from[active_idx, :],
                        name='2_side_branch_rate')
 
     return load_f
@@ -205,17 +208,13 @@ def add_battery_discharge_restriction(problem: LpProblem, SoC0, Capacity, Effici
     # compute the inverse of he efficiency because pulp does not divide by floats
     eff_inv = 1 / Efficiency
 
-    # set the Energy values for t=1:nt
-    for i in range(len(dt) - 1):
-
-        t = i + 1
-
-        # set the energy value Et = E(t-1) + dt * Pb / eff
-        lpAddRestrictions2(problem=problem,
-                           lhs=E[:, t],
-                           rhs=E[:, t-1] - dt[i] * Pb[:, t] * eff_inv,
-                           name='initial_soc_t' + str(t) + '_',
-                           op='=')
+    # set the Energy values for t=1:nt at once: Et = E(t-1) + dt * Pb / eff
+    nt = len(dt)
+    lpAddRestrictions2(problem=problem,
+                       lhs=E[:, 1:nt],
+                       rhs=E[:, :nt - 1] - dt[:nt - 1] * Pb[:, 1:nt] * np.reshape(eff_inv, (-1, 1)),
+                       name='soc_t',
+                       op='=')
 
 
 class OpfDcTimeSeries(OpfTimeSeries):
@@ -281,13 +280,15 @@ class OpfDcTimeSeries(OpfTimeSeries):
         # branch
         branch_ratings = self.numerical_circuit.branch_rates[:, a:b] / Sbase
         ys = 1 / (self.numerical_circuit.branch_R + 1j * self.numerical_circuit.branch_X)
-        Bseries = (self.numerical_circuit.branch_active[:, a:b].T * ys.imag).T
+        branch_active = self.numerical_circuit.branch_active[:, a:b]
+        Bseries = ys.imag[:, np.newaxis] * branch_active
+        active_branches = np.flatnonzero(branch_active.any(axis=1))
         cost_br = self.numerical_circuit.branch_cost[:, a:b]
 
         # Compute time delta in hours
         dt = np.zeros(nt)  # here nt = end_idx - start_idx
-        for t in range(1, nt):
-            dt[t - 1] = (self.numerical_circuit.time_array[a + t] - self.numerical_circuit.time_array[a + t - 1]).seconds / 3600
+        time_array = np.asarray(self.numerical_circuit.time_array[a:b], dtype='datetime64[s]')
+        dt[:nt - 1] = np.diff(time_array).astype(float) / 3600
 
         # create LP variables
         Pg = lpMakeVars(name='Pg', shape=(ng, nt), lower=Pg_min, upper=Pg_max)
@@ -325,7 +326,8 @@ class OpfDcTimeSeries(OpfTimeSeries):
                                                         start_=self.start_idx, end_=self.end_idx)
 
         load_f = add_branch_loading_restriction(problem, theta_f, theta_t, Bseries, branch_ratings,
-                                                branch_rating_slack1, branch_rating_slack2)
+                                                branch_rating_slack1, branch_rating_slack2,
+                                                active_idx=active_branches)
 
         # if there are batteries, add the batteries
         if nb > 0:
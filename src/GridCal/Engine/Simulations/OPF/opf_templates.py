@@ -96,7 +96,7 @@ class Opf:
         """
         val = np.zeros(arr.shape)
         for i in range(val.shape[0]):
-            val[i] = arr[i].value()
+            val[i] = value(arr[i])  # the array may contain numbers as well
         if make_abs:
             val = np.abs(val)
 
@@ -251,7 +251,7 @@ class OpfTimeSeries:
         """
         val = np.zeros(arr.shape)
         for i, j in product(range(val.shape[0]), range(val.shape[1])):
-            val[i, j] = arr[i, j].value()
+            val[i, j] = value(arr[i, j])  # the array may contain numbers as well
         if make_abs:
             val = np.abs(val)
 
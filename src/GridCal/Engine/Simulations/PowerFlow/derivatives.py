@@ -109,7 +109,7 @@ def dSbus_dV_numba_sparse_csc(Yx, Yp, Yi, V):
     return dS_dVm, dS_dVa
 
 
-@nb.jit(nopython=True, cache=False)
+@nb.jit(nopython=True, cache=True)
 def dSbus_dV_numba_sparse_csr(Yx, Yp, Yj, V, E, Ibus):  # pragma: no cover
     """
     partial derivatives of power injection w.r.t. voltage.
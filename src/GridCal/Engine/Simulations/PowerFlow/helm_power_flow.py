@@ -139,7 +139,7 @@ def pade4all(order, coeff_mat, s=1.0):
 
 
 # @nb.njit("(c16[:])(c16[:, :], c16[:, :], i8, c16[:])")
-@nb.njit()
+@nb.njit(cache=True)
 def sigma_function(coeff_matU, coeff_matX, order, V_slack):
     """
 
@@ -201,7 +201,7 @@ def conv1_old(A, B, c, indices):
 
 
 # @nb.njit("(c16[:])(c16[:, :], c16[:, :], i8)")
-@nb.njit()
+@nb.njit(cache=True)
 def conv1(A, B, c):
     """
     Performs the convolution of A* and B
@@ -219,7 +219,7 @@ def conv1(A, B, c):
 
 
 # @nb.njit("(c16[:])(c16[:, :], c16[:, :], i8, i8[:])")
-@nb.njit()
+@nb.njit(cache=True)
 def conv2(A, B, c, indices):
     """
     Performs the convolution of A and B
@@ -237,7 +237,7 @@ def conv2(A, B, c, indices):
 
 
 # @nb.njit("(c16[:])(c16[:, :], c16[:, :], i8, i8[:])")
-@nb.njit()
+@nb.njit(cache=True)
 def conv3(A, B, c, indices):
     """
     Performs the convolution of A and B*
@@ -357,11 +357,11 @@ def helm_coefficients_josep(Yseries, V0, S0, Ysh0, pq, pv, sl, pqpv, tolerance=1
         print('MAT')
         print(MAT.toarray())
 
-    # factorize (only once)
-    # MAT_LU = factorized(MAT.tocsc())
+    # factorize (only once), the system matrix is the same for all the coefficients
+    MAT_LU = factorized(MAT)
 
     # solve
-    LHS = spsolve(MAT, RHS)
+    LHS = MAT_LU(RHS)
 
     # update coefficients
     U[1, :] = LHS[:npqpv] + 1j * LHS[npqpv:2 * npqpv]
@@ -379,7 +379,7 @@ def helm_coefficients_josep(Yseries, V0, S0, Ysh0, pq, pv, sl, pqpv, tolerance=1
                     valor.imag,
                     -conv3(U, U, c, pv_).real]
 
-        LHS = spsolve(MAT, RHS)
+        LHS = MAT_LU(RHS)
 
         # update voltage coefficients
         U[c, :] = LHS[:npqpv] + 1j * LHS[npqpv:2 * npqpv]
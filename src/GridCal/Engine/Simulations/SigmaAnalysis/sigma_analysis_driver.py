@@ -13,7 +13,6 @@
 # You should have received a copy of the GNU General Public License
 # along with GridCal.  If not, see <http://www.gnu.org/licenses/>.
 import numpy as np
-import numba as nb
 from matplotlib import pyplot as plt
 
 from GridCal.Engine.basic_structures import Logger
@@ -90,11 +89,10 @@ class SigmaAnalysisResults:
 
         sx = np.linspace(-0.25, np.max(self.sigma_re) + 0.1, n_points)
         sy1 = np.sqrt(0.25 + sx)
-        sy2 = -np.sqrt(0.25 + sx)
+        sy2 = -sy1
         names = self.bus_names
 
-        ax.plot(sx, sy1, 'k', linewidth=2)
-        ax.plot(sx, sy2, 'k', linewidth=2)
+        ax.plot(sx, sy1, 'k', sx, sy2, 'k', linewidth=2)
 
         d = np.abs(np.nan_to_num(self.distances))
         colors = (d / d.max())
@@ -119,13 +117,18 @@ class SigmaAnalysisResults:
             annot.set_text(text)
             annot.get_bbox_patch().set_alpha(0.8)
 
+        hovered = list()  # indices of the points in the annotation
+
         def hover(event):
             if event.inaxes == ax:
                 cont, ind = sc.contains(event)
                 if cont:
-                    update_annotation(ind)
-                    annot.set_visible(True)
-                    fig.canvas.draw_idle()
+                    # redraw only when the hovered points change, not on every motion over the same ones
+                    if not annot.get_visible() or hovered != list(ind["ind"]):
+                        hovered[:] = ind["ind"]
+                        update_annotation(ind)
+                        annot.set_visible(True)
+                        fig.canvas.draw_idle()
                 else:
                     if annot.get_visible():
                         annot.set_visible(False)
@@ -209,55 +212,11 @@ def multi_island_sigma(multi_circuit: MultiCircuit, options: PowerFlowOptions, l
 
     calculation_inputs = nc.split_into_islands(ignore_single_node_islands=options.ignore_single_node_islands)
 
-    if len(calculation_inputs) > 1:
-
-        # simulate each island and merge the results
-        for i, calculation_input in enumerate(calculation_inputs):
-
-            if len(calculation_input.vd) > 0:
-                # V, converged, norm_f, Scalc, iter_, elapsed, Sig_re, Sig_im
-                U, X, Q, iter_ = helm_coefficients_josep(Yseries=calculation_input.Yseries,
-                                                         V0=calculation_input.Vbus,
-                                                         S0=calculation_input.Sbus,
-                                                         Ysh0=calculation_input.Yshunt,
-                                                         pq=calculation_input.pq,
-                                                         pv=calculation_input.pv,
-                                                         sl=calculation_input.vd,
-                                                         pqpv=calculation_input.pqpv,
-                                                         tolerance=options.tolerance,
-                                                         max_coeff=options.max_iter,
-                                                         verbose=False,)
-
-                # compute the sigma values
-                n = calculation_input.nbus
-                Sig_re = np.zeros(n, dtype=float)
-                Sig_im = np.zeros(n, dtype=float)
-                Sigma = sigma_function(U, X, iter_ - 1, calculation_input.Vbus[calculation_input.vd])
-                Sig_re[calculation_input.pqpv] = np.real(Sigma)
-                Sig_im[calculation_input.pqpv] = np.imag(Sigma)
-                sigma_distances = sigma_distance(Sig_re, Sig_im)
-
-                # store the results
-                island_results = SigmaAnalysisResults(n=len(calculation_input.Vbus))
-                island_results.lambda_value = 1.0
-                island_results.Sbus = calculation_input.Sbus
-                island_results.sigma_re = Sig_re
-                island_results.sigma_im = Sig_im
-                island_results.distances = sigma_distances
-
-                bus_original_idx = calculation_input.original_bus_idx
-
-                # merge the results from this island
-                results.apply_from_island(island_results, bus_original_idx)
-
-            else:
-                logger.add_info('No slack nodes in the island', str(i))
-    else:
-
-        if len(calculation_inputs[0].vd) > 0:
-            # only one island
-            calculation_input = calculation_inputs[0]
+    # simulate each island and merge the results
+    for i, calculation_input in enumerate(calculation_inputs):
 
+        if len(calculation_input.vd) > 0:
+            # V, converged, norm_f, Scalc, iter_, elapsed, Sig_re, Sig_im
             U, X, Q, iter_ = helm_coefficients_josep(Yseries=calculation_input.Yseries,
                                                      V0=calculation_input.Vbus,
                                                      S0=calculation_input.Sbus,
@@ -268,33 +227,29 @@ def multi_island_sigma(multi_circuit: MultiCircuit, options: PowerFlowOptions, l
                                                      pqpv=calculation_input.pqpv,
                                                      tolerance=options.tolerance,
                                                      max_coeff=options.max_iter,
-                                                     verbose=False, )
+                                                     verbose=False,)
 
-            # compute the sigma values
-            n = calculation_input.nbus
-            Sig_re = np.zeros(n, dtype=float)
-            Sig_im = np.zeros(n, dtype=float)
+            # write the sigma values straight into the merged results
+            bus_original_idx = np.asarray(calculation_input.original_bus_idx)
+            pqpv_original_idx = bus_original_idx[calculation_input.pqpv]
             Sigma = sigma_function(U, X, iter_ - 1, calculation_input.Vbus[calculation_input.vd])
-            Sig_re[calculation_input.pqpv] = np.real(Sigma)
-            Sig_im[calculation_input.pqpv] = np.imag(Sigma)
-            sigma_distances = sigma_distance(Sig_re, Sig_im)
-
-            # store the results
-            island_results = SigmaAnalysisResults(n=len(calculation_input.Vbus))
-            island_results.lambda_value = 1.0
-            island_results.Sbus = calculation_input.Sbus
-            island_results.sigma_re = Sig_re
-            island_results.sigma_im = Sig_im
-            island_results.distances = sigma_distances
-
-            results.apply_from_island(island_results, calculation_input.original_bus_idx)
+            results.Sbus[bus_original_idx] = calculation_input.Sbus
+            results.sigma_re[pqpv_original_idx] = np.real(Sigma)
+            results.sigma_im[pqpv_original_idx] = np.imag(Sigma)
+
+            # the slack sigma values are zero, so their distance is left at the default 0.25
+            results.distances[pqpv_original_idx] = sigma_distance(results.sigma_re[pqpv_original_idx],
+                                                                  results.sigma_im[pqpv_original_idx])
+
+        elif len(calculation_inputs) > 1:
+            logger.add_info('No slack nodes in the island', str(i))
+
         else:
             logger.add_error('There are no slack nodes')
 
     return results
 
 
-@nb.jit()
 def sigma_distance(sigma_real, sigma_imag):
     """
     Distance to the collapse in the sigma space
@@ -324,40 +279,26 @@ def sigma_distance(sigma_real, sigma_imag):
     :param sigma_imag: Sigma imag array
     :return: distance of the sigma point to the curve sqrt(0.25 + x)
     """
-    n = len(sigma_real)
-    x1 = np.zeros(n)
-
-    i = 0
+    a = sigma_real
+    b = sigma_imag
+    a2 = a * a
+    a3 = a2 * a
+    b2 = b * b
     sq3 = np.sqrt(3)
 
-    for a, b in zip(sigma_real, sigma_imag):
-
-        t0 = -64 * a ** 3 * b ** 2 \
-             + 48 * a ** 2 * b ** 2 \
-             - 12 * a * b ** 2 \
-             + 108 * b ** 4 + b ** 2
+    # -64 a^3 + 48 a^2 - 12 a + 1 appears in both t0 and t1
+    p = -64 * a3 + 48 * a2 - 12 * a + 1
 
-        if t0 > 0:
-
-            t1 = (-64 * a**3
-                  + 48 * a**2
-                  + 12 * sq3 * np.sqrt(t0)
-                  - 12 * a + 216 * b**2 + 1)**(1 / 3)
-
-            # the value is within limits
-            x1[i] = 1 / 12 * t1 - (-256 * a**2 + 128 * a - 16) / (192 * t1) + 1 / 12 * (8 * a - 5)
-        else:
-            t1 = (-64 * a ** 3
-                  + 48 * a ** 2
-                  + 12 * sq3 * np.sqrt(-t0)
-                  - 12 * a + 216 * b ** 2 + 1) ** (1 / 3)
+    t0 = b2 * (p + 108 * b2)
 
-            # here I set the value negative to indicate that it is off-limits
-            x1[i] = -(1 / 12 * t1 - (-256 * a**2 + 128 * a - 16) / (192 * t1) + 1 / 12 * (8 * a - 5))
+    # np.cbrt is cheaper than the fractional power, but the negative radicands must stay nan as with x ** (1 / 3)
+    r = p + 216 * b2 + 12 * sq3 * np.sqrt(np.abs(t0))
+    t1 = np.where(r >= 0, np.cbrt(r), np.nan)
 
-        i += 1
+    x1 = 1 / 12 * t1 - (-256 * a2 + 128 * a - 16) / (192 * t1) + 1 / 12 * (8 * a - 5)
 
-    return x1
+    # the values where t0 <= 0 are set negative to indicate that they are off-limits
+    return np.where(t0 > 0, x1, -x1)
 
 
 class SigmaAnalysisDriver(DriverTemplate):
@@ -14,6 +14,8 @@
 # along with GridCal.  If not, see <http://www.gnu.org/licenses/>.
 
 import numpy as np
+from itertools import chain
+from operator import attrgetter
 
 from GridCal.Engine.Simulations.StateEstimation.state_estimation import solve_se_lm
 from GridCal.Engine.Simulations.PowerFlow.power_flow_worker import PowerFlowResults, power_flow_post_process
@@ -91,15 +93,10 @@ class StateEstimationInput:
 
         nz = len(self.p_inj) + len(self.p_flow) + len(self.q_inj) + len(self.q_flow) + len(self.i_flow) + len(self.vm_m)
 
-        magnitudes = np.zeros(nz)
-        sigma = np.zeros(nz)
-
-        # go through the measurements in order and form the vectors
-        k = 0
-        for m in self.p_flow + self.p_inj + self.q_flow + self.q_inj + self.i_flow + self.vm_m:
-            magnitudes[k] = m.val
-            sigma[k] = m.sigma
-            k += 1
+        # go through the measurements in order and form the vectors (the order must match the jacobian blocks)
+        groups = (self.p_flow, self.p_inj, self.q_flow, self.q_inj, self.i_flow, self.vm_m)
+        magnitudes = np.fromiter(map(attrgetter('val'), chain.from_iterable(groups)), dtype=float, count=nz)
+        sigma = np.fromiter(map(attrgetter('sigma'), chain.from_iterable(groups)), dtype=float, count=nz)
 
         return magnitudes, sigma
 
@@ -143,58 +140,57 @@ class StateEstimation(DriverTemplate):
         self.se_results = None
 
     @staticmethod
-    def collect_measurements(circuit: MultiCircuit, bus_idx, branch_idx):
+    def collect_measurements(circuit: MultiCircuit, bus_idx, branch_idx, branches=None):
         """
         Form the input from the circuit measurements
+        :param circuit: MultiCircuit instance
+        :param bus_idx: indices of the buses to collect
+        :param branch_idx: indices of the branches to collect
+        :param branches: list of branches of the circuit (circuit.get_branches()), computed if not given
         :return: nothing, the input object is stored in this class
         """
         se_input = StateEstimationInput()
 
-        # collect the bus measurements
-        for i in bus_idx:
+        # lists (indices, measurements) where each measurement type is stored
+        bus_lists = {MeasurementType.Pinj: (se_input.p_inj_idx, se_input.p_inj),
+                     MeasurementType.Qinj: (se_input.q_inj_idx, se_input.q_inj),
+                     MeasurementType.Vmag: (se_input.vm_m_idx, se_input.vm_m)}
 
-            for m in circuit.buses[i].measurements:
+        branch_lists = {MeasurementType.Pflow: (se_input.p_flow_idx, se_input.p_flow),
+                        MeasurementType.Qflow: (se_input.q_flow_idx, se_input.q_flow),
+                        MeasurementType.Iflow: (se_input.i_flow_idx, se_input.i_flow)}
 
-                if m.measurement_type == MeasurementType.Pinj:
-                    se_input.p_inj_idx.append(i)
-                    se_input.p_inj.append(m)
+        # collect the bus measurements
+        buses = circuit.buses
+        for i in bus_idx:
 
-                elif m.measurement_type == MeasurementType.Qinj:
-                    se_input.q_inj_idx.append(i)
-                    se_input.q_inj.append(m)
+            for m in buses[i].measurements:
 
-                elif m.measurement_type == MeasurementType.Vmag:
-                    se_input.vm_m_idx.append(i)
-                    se_input.vm_m.append(m)
+                lists = bus_lists.get(m.measurement_type, None)
 
-                else:
-                    raise Exception('The bus ' + str(circuit.buses[i]) + ' contains a measurement of type '
+                if lists is None:
+                    raise Exception('The bus ' + str(buses[i]) + ' contains a measurement of type '
                                     + str(m.measurement_type))
 
+                lists[0].append(i)
+                lists[1].append(m)
+
         # collect the branch measurements
-        branches = circuit.get_branches()
+        if branches is None:
+            branches = circuit.get_branches()
         for i in branch_idx:
 
-            # branch = circuit.branches[i]
-
             for m in branches[i].measurements:
 
-                if m.measurement_type == MeasurementType.Pflow:
-                    se_input.p_flow_idx.append(i)
-                    se_input.p_flow.append(m)
-
-                elif m.measurement_type == MeasurementType.Qflow:
-                    se_input.q_flow_idx.append(i)
-                    se_input.q_flow.append(m)
-
-                elif m.measurement_type == MeasurementType.Iflow:
-                    se_input.i_flow_idx.append(i)
-                    se_input.i_flow.append(m)
+                lists = branch_lists.get(m.measurement_type, None)
 
-                else:
+                if lists is None:
                     raise Exception('The branch ' + str(branches[i]) + ' contains a measurement of type '
                                     + str(m.measurement_type))
 
+                lists[0].append(i)
+                lists[1].append(m)
+
         return se_input
 
     def run(self):
@@ -212,12 +208,16 @@ class StateEstimation(DriverTemplate):
 
         self.se_results.bus_types = numerical_circuit.bus_types
 
+        # the branches list is built once for all the islands
+        branches = self.grid.get_branches()
+
         for island in islands:
 
             # collect inputs of the island
             se_input = self.collect_measurements(circuit=self.grid,
                                                  bus_idx=island.original_bus_idx,
-                                                 branch_idx=island.original_branch_idx)
+                                                 branch_idx=island.original_branch_idx,
+                                                 branches=branches)
 
             # run solver
             v_sol, err, converged = solve_se_lm(Ybus=island.Ybus,
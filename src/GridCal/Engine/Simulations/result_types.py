@@ -119,7 +119,7 @@ class ResultTypes(Enum):
     AvailableTransferCapacityReport = 'ATC Report', DeviceType.NoDevice
 
     def __str__(self):
-        return self.value
+        return self.value[0]
 
     def __repr__(self):
         return str(self)
@@ -22,6 +22,12 @@ from GridCal.Gui.GuiFunctions import ObjectsModel, PandasModel
 from GridCal.Gui.GridEditorWidget.messages import *
 from GridCal.Gui.GridEditorWidget.matplotlibwidget import MatplotlibWidget
 
+# pens of the generator items (Qt copies the pen on setPen, so they can be shared), keyed by the active state
+_WIDTH = 4
+_PENS = {True: QPen(ACTIVE['color'], _WIDTH, ACTIVE['style']),
+         False: QPen(DEACTIVATED['color'], _WIDTH, DEACTIVATED['style']),
+         None: QPen(OTHER['color'], _WIDTH, OTHER['style'])}
+
 
 class GeneratorEditor(QDialog):
 
@@ -83,25 +89,14 @@ class GeneratorGraphicItem(QGraphicsItemGroup):
         self.setFlags(self.ItemIsSelectable | self.ItemIsMovable)
         self.setCursor(QCursor(Qt.PointingHandCursor))
 
-        self.width = 4
-        if self.api_object is not None:
-            if self.api_object.active:
-                self.style = ACTIVE['style']
-                self.color = ACTIVE['color']
-            else:
-                self.style = DEACTIVATED['style']
-                self.color = DEACTIVATED['color']
-        else:
-            self.style = OTHER['style']
-            self.color = OTHER['color']
+        self.width = _WIDTH
+        pen = self.set_pen_state()
 
         # line to tie this object with the original bus (the parent)
         self.nexus = QGraphicsLineItem()
-        self.nexus.setPen(QPen(self.color, self.width, self.style))
+        self.nexus.setPen(pen)
         parent.scene().addItem(self.nexus)
 
-        pen = QPen(self.color, self.width, self.style)
-
         self.glyph = Circle(self)
         self.glyph.setRect(0, 0, self.h, self.w)
         self.glyph.setPen(pen)
@@ -114,6 +109,17 @@ class GeneratorGraphicItem(QGraphicsItemGroup):
         self.setPos(self.parent.x(), self.parent.y() + 100)
         self.update_line(self.pos())
 
+    def set_pen_state(self):
+        """
+        Set the style and color from the active state of the API object
+        :return: shared QPen of that state
+        """
+        state = bool(self.api_object.active) if self.api_object is not None else None
+        pen = _PENS[state]
+        self.style = pen.style()
+        self.color = pen.color()
+        return pen
+
     def update_line(self, pos):
         """
         Update the line that joins the parent and this object
@@ -203,17 +209,7 @@ class GeneratorGraphicItem(QGraphicsItemGroup):
         @return:
         """
         self.api_object.active = val
-        if self.api_object is not None:
-            if self.api_object.active:
-                self.style = ACTIVE['style']
-                self.color = ACTIVE['color']
-            else:
-                self.style = DEACTIVATED['style']
-                self.color = DEACTIVATED['color']
-        else:
-            self.style = OTHER['style']
-            self.color = OTHER['color']
-        self.glyph.setPen(QPen(self.color, self.width, self.style))
+        self.glyph.setPen(self.set_pen_state())
         self.label.setDefaultTextColor(self.color)
 
     def plot(self):
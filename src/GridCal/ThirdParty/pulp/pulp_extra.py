@@ -18,16 +18,18 @@ This file includes extensions to the PuLP library
 """
 
 import numpy as np
-from .pulp import LpProblem, LpVariable
+from .pulp import LpProblem, LpVariable, LpAffineExpression, lpSum
 from itertools import product
-from scipy.sparse import csc_matrix
+from scipy.sparse import csr_matrix
 
 
 def lpDot(mat, arr):
     """
-    CSC matrix-vector or CSC matrix-matrix dot product (A x b)
-    :param mat: CSC sparse matrix (A)
-    :param arr: dense vector or matrix of object type (b)
+    Sparse matrix-vector or sparse matrix-matrix dot product (A x b)
+    with object arrays, each entry of the result is summed from the terms of the corresponding CSR row of A;
+    with numeric arrays the product is delegated to scipy (mat @ arr)
+    :param mat: sparse matrix (A) of any format, converted with tocsr()
+    :param arr: dense vector or matrix (b), of object type (i.e. LpVariables) or numeric
     :return: vector or matrix result of the product
     """
     n_rows, n_cols = mat.shape
@@ -35,22 +37,26 @@ def lpDot(mat, arr):
     # check dimensional compatibility
     assert (n_cols == arr.shape[0])
 
-    # check that the sparse matrix is indeed of CSC format
-    if mat.format == 'csc':
-        mat_2 = mat
-    else:
-        # convert the matrix to CSC sparse
-        mat_2 = csc_matrix(mat)
+    if arr.dtype != object:
+        # plain numbers, let scipy do it
+        return mat @ arr
+
+    # walk the matrix by rows (the conversion is done by scipy in C), so that each entry of the
+    # result is summed once from its list of terms instead of being accumulated term by term.
+    # tocsr returns the matrix itself when it is already CSR, without copying or re-validating it
+    mat_2 = mat.tocsr()
 
     if len(arr.shape) == 1:
         """
         Uni-dimensional sparse matrix - vector product
         """
         res = np.zeros(n_rows, dtype=arr.dtype)
-        for i in range(n_cols):
-            for ii in range(mat_2.indptr[i], mat_2.indptr[i + 1]):
-                j = mat_2.indices[ii]  # row index
-                res[j] += mat_2.data[ii] * arr[i]  # C.data[ii] is equivalent to C[i, j]
+        for j in range(n_rows):
+            a, b = mat_2.indptr[j], mat_2.indptr[j + 1]
+            if a < b:
+                # the connectivity matrices are made of ones, those terms need no product
+                res[j] = lpSum([x if v == 1 else v * x
+                                for v, x in zip(mat_2.data[a:b], arr[mat_2.indices[a:b]])])
     else:
         """
         Multi-dimensional sparse matrix - matrix product
@@ -58,11 +64,67 @@ def lpDot(mat, arr):
         cols_vec = arr.shape[1]
         res = np.zeros((n_rows, cols_vec), dtype=arr.dtype)
 
-        for k in range(cols_vec):  # for each column of the matrix "vec", do the matrix vector product
-            for i in range(n_cols):
-                for ii in range(mat_2.indptr[i], mat_2.indptr[i + 1]):
-                    j = mat_2.indices[ii]  # row index
-                    res[j, k] += mat_2.data[ii] * arr[i, k]  # C.data[ii] is equivalent to C[i, j]
+        for j in range(n_rows):
+            a, b = mat_2.indptr[j], mat_2.indptr[j + 1]
+            if a < b:
+                values = mat_2.data[a:b]
+                rows = arr[mat_2.indices[a:b], :]
+                for k in range(cols_vec):  # for each column of the matrix "arr", do the row - vector product
+                    res[j, k] = lpSum([x if v == 1 else v * x for v, x in zip(values, rows[:, k])])
+    return res
+
+
+def lpDotSubMatrix(mat, row_idx, col_idx, arr):
+    """
+    Sparse sub-matrix - vector or sub-matrix - matrix product, equivalent to lpDot(mat[np.ix_(row_idx, col_idx)], arr[col_idx])
+    without slicing the matrix: the rows are walked in the CSR structure and each resulting entry is built at once
+    :param mat: sparse matrix (A), converted to CSR if it is not
+    :param row_idx: indices of the rows of A to use
+    :param col_idx: indices of the columns of A to use (None for all the columns)
+    :param arr: dense vector or matrix of LpVariables for all the columns of A (b)
+    :return: vector or matrix result of the product (len(row_idx)) or (len(row_idx), arr.shape[1])
+    """
+    n_rows, n_cols = mat.shape
+
+    # check dimensional compatibility
+    assert (n_cols == arr.shape[0])
+
+    if mat.format != 'csr':
+        mat = csr_matrix(mat)
+
+    # the expressions are built from (variable, coefficient) pairs, so the repeated entries of a row must be added first
+    if not mat.has_canonical_format:
+        mat = mat.copy()
+        mat.sum_duplicates()
+
+    # mark the columns that participate in the product
+    if col_idx is None:
+        col_used = np.ones(n_cols, dtype=bool)
+    else:
+        col_used = np.zeros(n_cols, dtype=bool)
+        col_used[col_idx] = True
+
+    if len(arr.shape) == 1:
+        res = np.empty(len(row_idx), dtype=object)
+    else:
+        res = np.empty((len(row_idx), arr.shape[1]), dtype=object)
+
+    for r, i in enumerate(row_idx):
+        # non zero columns of the row i that are in col_idx (explicitly stored zeros are skipped as well)
+        a, b = mat.indptr[i], mat.indptr[i + 1]
+        cols = mat.indices[a:b]
+        values = mat.data[a:b]
+        used = col_used[cols] & (values != 0)
+        cols = cols[used]
+        values = values[used]
+
+        # the columns are unique, so the expression is built directly from the (variable, coefficient) pairs
+        if len(arr.shape) == 1:
+            res[r] = LpAffineExpression(zip(arr[cols], values))
+        else:
+            for k in range(arr.shape[1]):
+                res[r, k] = LpAffineExpression(zip(arr[cols, k], values))
+
     return res
 
 
@@ -85,43 +147,29 @@ def lpAddRestrictions(problem: LpProblem, arr, name):
             problem.add(arr[i, j], name + '_' + str(i + 1) + '_' + str(j))
 
 
+_comparison_ufuncs = {'=': np.equal,
+                      '<=': np.less_equal,
+                      '>=': np.greater_equal}
+
+
 def lpAddRestrictions2(problem: LpProblem, lhs, rhs, name, op='='):
     """
     Add vector or matrix of restrictions to the problem
     :param problem: instance of LpProblem
     :param lhs: 1D array (left hand side)
-    :param rhs: 1D or 2D array (right hand side)
+    :param rhs: 1D or 2D array (right hand side), or scalar to use the same value for all the restrictions
     :param name: name of the restriction    
     :param op: type of restriction (=, <=, >=)
     """
 
-    assert(lhs.shape == rhs.shape)
-
-    arr = np.empty(lhs.shape, dtype=object)
-
-    if len(lhs.shape) == 1:
-
-        for i in range(lhs.shape[0]):
-            if op == '=':
-                arr[i] = lhs[i] == rhs[i]
-
-            elif op == '<=':
-                arr[i] = lhs[i] <= rhs[i]
+    # scalars are broadcast to the lhs shape as a read-only view, without allocating an array
+    rhs = np.broadcast_to(rhs, lhs.shape) if np.ndim(rhs) == 0 else rhs
 
-            elif op == '>=':
-                arr[i] = lhs[i] >= rhs[i]
-
-    elif len(lhs.shape) == 2:
-
-        for i, j in product(range(lhs.shape[0]), range(lhs.shape[1])):
-            if op == '=':
-                arr[i, j] = lhs[i, j] == rhs[i, j]
-
-            elif op == '<=':
-                arr[i, j] = lhs[i, j] <= rhs[i, j]
+    assert(lhs.shape == rhs.shape)
 
-            elif op == '>=':
-                arr[i, j] = lhs[i, j] >= rhs[i, j]
+    # the comparisons are applied element-wise by the object ufuncs in a single call,
+    # each one of them produces the LpConstraint of its pair of elements
+    arr = _comparison_ufuncs[op](lhs, rhs, dtype=object)
 
     lpAddRestrictions(problem=problem, arr=arr, name=name)
 
@@ -15,7 +15,7 @@ grid = MultiCircuit(name='lynn 5 bus')
 
 # let's create a master profile
 date0 = dt.datetime(2021, 1, 1)
-time_array = pd.DatetimeIndex([date0 + dt.timedelta(hours=i) for i in range(26)])
+time_array = pd.date_range(date0, periods=26, freq='H')
 x = np.linspace(-np.pi, np.pi, len(time_array))
 y = np.abs(np.sin(x))
 df_0 = pd.DataFrame(data=y, index=time_array)  # complex values
@@ -127,16 +127,19 @@ grid.add_branch(Branch(bus4, bus5, name='Line 4-5', r=0.04, x=0.09, b=0.02, rate
 # Overwrite the default profiles with the custom ones
 ####################################################################################################################
 
+# the master profile shape is shared by all the devices
+shape = df_0.values[:, 0]
+
 for load in grid.get_loads():
-    load.P_prof = load.P * df_0.values[:, 0]
-    load.Q_prof = load.Q * df_0.values[:, 0]
+    load.P_prof = load.P * shape
+    load.Q_prof = load.Q * shape
 
 for gen in grid.get_static_generators():
-    gen.P_prof = gen.Q * df_0.values[:, 0]
-    gen.Q_prof = gen.Q * df_0.values[:, 0]
+    gen.P_prof = gen.P * shape
+    gen.Q_prof = gen.Q * shape
 
 for gen in grid.get_generators():
-    gen.P_prof = gen.P * df_0.values[:, 0]
+    gen.P_prof = gen.P * shape
 
 ####################################################################################################################
 # Run a power flow simulation
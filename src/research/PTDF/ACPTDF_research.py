@@ -73,17 +73,18 @@ def compute_acptdf(Ybus, Yf, Yt, Cf, V, Ibus, pq, pv, distribute_slack):
     # compute the Jacobian
     J = Jacobian(Ybus, V, Ibus, pq, pvpq)
 
+    # only the pv and pq rows of the power increments are used, so the n x n array is not built
+    npvpq = len(pvpq)
     if distribute_slack:
-        dP = np.ones((n, n)) * (-1 / (n - 1))
-        for i in range(n):
-            dP[i, i] = 1.0
+        dP = np.full((npvpq, n), -1 / (n - 1))
     else:
-        dP = np.eye(n, n)
+        dP = np.zeros((npvpq, n))
+    dP[np.arange(npvpq), pvpq] = 1.0
 
     # compose the compatible array (the Q increments are considered zero
     dQ = np.zeros((npq, n))
     # dQ = np.eye(n, n)[pq, :]
-    dS = np.r_[dP[pvpq, :], dQ]
+    dS = np.r_[dP, dQ]
 
     # solve the voltage increments
     dx = spsolve(J, dS)
@@ -97,18 +98,20 @@ def compute_acptdf(Ybus, Yf, Yt, Cf, V, Ibus, pq, pv, distribute_slack):
     Ediag_conj = sp.diags(np.conj(E))
     If_diag_conj = sp.diags(np.conj(If))
 
-    Yf_conj = Yf.copy()
-    Yf_conj.data = np.conj(Yf_conj.data)
-    Yt_conj = Yt.copy()
-    Yt_conj.data = np.conj(Yt_conj.data)
+    Yf_conj = Yf.conj(copy=False)  # shares indices / indptr, only the data is new
+    Yt_conj = Yt.conj(copy=False)  # shares indices / indptr, only the data is new
 
-    dSf_dVa = 1j * (If_diag_conj * Cf * Vdiag - sp.diags(Cf * V) * Yf_conj * Vdiag_conj)
-    dSf_dVm = If_diag_conj * Cf * Ediag - sp.diags(Cf * V) * Yf_conj * Ediag_conj
+    # products shared by both derivatives
+    IfCf = If_diag_conj * Cf
+    VfYf = sp.diags(Cf * V) * Yf_conj
+
+    dSf_dVa = 1j * (IfCf * Vdiag - VfYf * Vdiag_conj)
+    dSf_dVm = IfCf * Ediag - VfYf * Ediag_conj
 
     # compose the final AC-PTDF
     dPf_dVa = dSf_dVa.real[:, pvpq]
     dPf_dVm = dSf_dVm.real[:, pq]
-    PTDF = sp.hstack((dPf_dVa, dPf_dVm)) * dx
+    PTDF = dPf_dVa * dx[:npvpq, :] + dPf_dVm * dx[npvpq:, :]  # same as hstack((dPf_dVa, dPf_dVm)) * dx
 
     return PTDF
 
@@ -138,28 +141,20 @@ def make_lodf(circuit: SnapshotCircuit, PTDF, correct_values=True):
     # LODF[LODF == np.inf] = 0
     # LODF = np.nan_to_num(LODF)
 
-    # this loop avoids the divisions by zero
+    # divide the columns of H by 1 - H.diagonal avoiding the divisions by zero
     # in those cases the LODF column should be zero
+    H = np.asarray(H)
     LODF = np.zeros((nl, nl))
     div = 1 - H.diagonal()
-    for j in range(H.shape[1]):
-        if div[j] != 0:
-            LODF[:, j] = H[:, j] / div[j]
+    np.divide(H, div[np.newaxis, :], out=LODF, where=(div != 0)[np.newaxis, :])
 
     # replace the diagonal elements by -1
     # old code
     # LODF = LODF - sp.diags(LODF.diagonal()) - sp.eye(nl, nl), replaced by:
-    for i in range(nl):
-        LODF[i, i] = - 1.0
+    np.fill_diagonal(LODF, -1.0)
 
     if correct_values:
-        i1, j1 = np.where(LODF > 1)
-        for i, j in zip(i1, j1):
-            LODF[i, j] = 1
-
-        i2, j2 = np.where(LODF < -1)
-        for i, j in zip(i2, j2):
-            LODF[i, j] = -1
+        np.clip(LODF, -1, 1, out=LODF)
 
     return LODF
 
@@ -178,6 +173,7 @@ def get_branch_time_series(circuit: TimeCircuit, PTDF):
     return Pbr
 
 
+@nb.njit(cache=True)
 def multiple_failure_old(flows, LODF, beta, delta, alpha):
     """
 
@@ -188,22 +184,23 @@ def multiple_failure_old(flows, LODF, beta, delta, alpha):
     :param alpha: index of the line where you want to see the effects
     :return: post contingency flow in the line alpha
     """
-    # multiple contingency matrix
-    M = np.ones((2, 2))
-    M[0, 1] = -LODF[beta, delta]
-    M[1, 0] = -LODF[delta, beta]
+    # multiple contingency matrix M = [[1, a], [b, 1]]
+    a = -LODF[beta, delta]
+    b = -LODF[delta, beta]
+    det = 1.0 - a * b
 
     # normal flows of the lines beta and delta
-    F = flows[[beta, delta]]
+    F0 = flows[beta]
+    F1 = flows[delta]
 
-    # contingency flows after failing the ines beta and delta
-    Ff = np.linalg.solve(M, F)
+    # contingency flows after failing the ines beta and delta (M x Ff = F solved by Cramer's rule)
+    Ff0 = (F0 - a * F1) / det
+    Ff1 = (F1 - b * F0) / det
 
     # flow delta in the line alpha after the multiple contingency of the lines beta and delta
-    L = LODF[alpha, :][[beta, delta]]
-    dFf_alpha = np.dot(L, Ff)
+    dFf_alpha = LODF[alpha, beta] * Ff0 + LODF[alpha, delta] * Ff1
 
-    return F[alpha] + dFf_alpha
+    return flows[alpha] + dFf_alpha
 
 
 def multiple_failure(flows, LODF, failed_idx):
@@ -243,12 +240,14 @@ def get_n_minus_1_flows(circuit: MultiCircuit):
     m = circuit.get_branch_number()
     Pmat = np.zeros((m, m))  # monitored, contingency
 
+    # the driver compiles the circuit on every run, so it picks up the status changes
+    pf = PowerFlowDriver(circuit, opt)
+
     for c, branch in enumerate(branches):
 
         if branch.active:
             branch.active = False
 
-            pf = PowerFlowDriver(circuit, opt)
             pf.run()
             Pmat[:, c] = pf.results.Sbranch.real
 
@@ -283,12 +282,9 @@ def check_lodf(grid: MultiCircuit):
     Pbus = circuit.get_injections(False).real
     flows_n = np.dot(PTDF, Pbus)
 
-    nl = circuit.nbr
-    flows_n1 = np.zeros((nl, nl))
-    for c in range(nl):  # branch that fails (contingency)
-        # for m in range(nl):  # branch to monitor
-        #     flows_n1[m, c] = flows_n[m] + LODF[m, c] * flows_n[c]
-        flows_n1[:, c] = flows_n[:] + LODF[:, c] * flows_n[c]
+    # for every branch m to monitor and branch c that fails (contingency):
+    #     flows_n1[m, c] = flows_n[m] + LODF[m, c] * flows_n[c]
+    flows_n1 = flows_n[:, np.newaxis] + LODF * flows_n[np.newaxis, :]
 
     return flows_n, flows_n1_nr, flows_n1
 
@@ -120,16 +120,21 @@ def compute_ptdf(Ybus, Yf, Yt, Cf, Ct, V, Ibus, Sbus, pq, pv):
     Ediag_conj = sp.diags(np.conj(E))
     If_diag_conj = sp.diags(np.conj(If))
     It_diag_conj = sp.diags(np.conj(It))
-    Yf_conj = Yf.copy()
-    Yf_conj.data = np.conj(Yf_conj.data)
-    Yt_conj = Yt.copy()
-    Yt_conj.data = np.conj(Yt_conj.data)
+    Yf_conj = Yf.conj(copy=False)  # shares indices / indptr, only the data is new
+    Yt_conj = Yt.conj(copy=False)  # shares indices / indptr, only the data is new
 
-    dSf_dVa = 1j * (If_diag_conj * Cf * Vdiag - sp.diags(Cf * V) * Yf_conj * Vdiag_conj)
-    dSf_dVm = If_diag_conj * Cf * Ediag - sp.diags(Cf * V) * Yf_conj * Ediag_conj
+    # products shared by both derivatives
+    IfCf = If_diag_conj * Cf
+    VfYf = sp.diags(Cf * V) * Yf_conj
 
-    dSt_dVa = 1j * (It_diag_conj * Ct * Vdiag - sp.diags(Ct * V) * Yt_conj * Vdiag_conj)
-    dSt_dVm = It_diag_conj * Ct * Ediag - sp.diags(Ct * V) * Yt_conj * Ediag_conj
+    dSf_dVa = 1j * (IfCf * Vdiag - VfYf * Vdiag_conj)
+    dSf_dVm = IfCf * Ediag - VfYf * Ediag_conj
+
+    ItCt = It_diag_conj * Ct
+    VtYt = sp.diags(Ct * V) * Yt_conj
+
+    dSt_dVa = 1j * (ItCt * Vdiag - VtYt * Vdiag_conj)
+    dSt_dVm = ItCt * Ediag - VtYt * Ediag_conj
 
     PTDF = np.dot(np.c_[dSf_dVa.real[:, pvpq].toarray(), dSf_dVm.real[:, pq].toarray()], dx)
 
@@ -175,28 +180,20 @@ def make_lodf(circuit: SnapshotData, PTDF, correct_values=True):
     # LODF[LODF == np.inf] = 0
     # LODF = np.nan_to_num(LODF)
 
-    # this loop avoids the divisions by zero
+    # divide the columns of H by 1 - H.diagonal avoiding the divisions by zero
     # in those cases the LODF column should be zero
+    H = np.asarray(H)
     LODF = np.zeros((nl, nl))
     div = 1 - H.diagonal()
-    for j in range(H.shape[1]):
-        if div[j] != 0:
-            LODF[:, j] = H[:, j] / div[j]
+    np.divide(H, div[np.newaxis, :], out=LODF, where=(div != 0)[np.newaxis, :])
 
     # replace the diagonal elements by -1
     # old code
     # LODF = LODF - sp.diags(LODF.diagonal()) - sp.eye(nl, nl), replaced by:
-    for i in range(nl):
-        LODF[i, i] = - 1.0
+    np.fill_diagonal(LODF, -1.0)
 
     if correct_values:
-        i1, j1 = np.where(LODF > 1)
-        for i, j in zip(i1, j1):
-            LODF[i, j] = 1
-
-        i2, j2 = np.where(LODF < -1)
-        for i, j in zip(i2, j2):
-            LODF[i, j] = -1
+        np.clip(LODF, -1, 1, out=LODF)
 
     return LODF
 
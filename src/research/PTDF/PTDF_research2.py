@@ -14,6 +14,7 @@
 # along with GridCal.  If not, see <http://www.gnu.org/licenses/>.
 
 import numpy as np
+import numba as nb
 import pandas as pd
 import time
 from warnings import warn
@@ -82,28 +83,20 @@ def make_lodf(Cf, Ct, PTDF, correct_values=True):
     # LODF[LODF == np.inf] = 0
     # LODF = np.nan_to_num(LODF)
 
-    # this loop avoids the divisions by zero
+    # divide the columns of H by 1 - H.diagonal avoiding the divisions by zero
     # in those cases the LODF column should be zero
+    H = np.asarray(H)
     LODF = np.zeros((nl, nl))
     div = 1 - H.diagonal()
-    for j in range(H.shape[1]):
-        if div[j] != 0:
-            LODF[:, j] = H[:, j] / div[j]
+    np.divide(H, div[np.newaxis, :], out=LODF, where=(div != 0)[np.newaxis, :])
 
     # replace the diagonal elements by -1
     # old code
     # LODF = LODF - sp.diags(LODF.diagonal()) - sp.eye(nl, nl), replaced by:
-    for i in range(nl):
-        LODF[i, i] = - 1.0
+    np.fill_diagonal(LODF, -1.0)
 
     if correct_values:
-        i1, j1 = np.where(LODF > 1)
-        for i, j in zip(i1, j1):
-            LODF[i, j] = 1
-
-        i2, j2 = np.where(LODF < -1)
-        for i, j in zip(i2, j2):
-            LODF[i, j] = -1
+        np.clip(LODF, -1, 1, out=LODF)
 
     return LODF
 
@@ -122,6 +115,7 @@ def get_branch_time_series(circuit: TimeCircuit, PTDF):
     return Pbr
 
 
+@nb.njit(cache=True)
 def multiple_failure_old(flows, LODF, beta, delta, alpha):
     """
 
@@ -132,22 +126,23 @@ def multiple_failure_old(flows, LODF, beta, delta, alpha):
     :param alpha: index of the line where you want to see the effects
     :return: post contingency flow in the line alpha
     """
-    # multiple contingency matrix
-    M = np.ones((2, 2))
-    M[0, 1] = -LODF[beta, delta]
-    M[1, 0] = -LODF[delta, beta]
+    # multiple contingency matrix M = [[1, a], [b, 1]]
+    a = -LODF[beta, delta]
+    b = -LODF[delta, beta]
+    det = 1.0 - a * b
 
     # normal flows of the lines beta and delta
-    F = flows[[beta, delta]]
+    F0 = flows[beta]
+    F1 = flows[delta]
 
-    # contingency flows after failing the ines beta and delta
-    Ff = np.linalg.solve(M, F)
+    # contingency flows after failing the ines beta and delta (M x Ff = F solved by Cramer's rule)
+    Ff0 = (F0 - a * F1) / det
+    Ff1 = (F1 - b * F0) / det
 
     # flow delta in the line alpha after the multiple contingency of the lines beta and delta
-    L = LODF[alpha, :][[beta, delta]]
-    dFf_alpha = np.dot(L, Ff)
+    dFf_alpha = LODF[alpha, beta] * Ff0 + LODF[alpha, delta] * Ff1
 
-    return F[alpha] + dFf_alpha
+    return flows[alpha] + dFf_alpha
 
 
 def multiple_failure(flows, LODF, failed_idx):
@@ -180,6 +175,35 @@ def multiple_failure(flows, LODF, failed_idx):
     return flows + dFf_alpha
 
 
+def multiple_failure_batched(flows, LODF, failed_idx_list):
+    """
+    Vectorized version of multiple_failure for many contingencies of the same size
+    :param flows: array of all the pre-contingency flows (the base flows)
+    :param LODF: Line Outage Distribution Factors Matrix
+    :param failed_idx_list: list of B contingencies, each one with the indices of its k failed lines
+    :return: B x nl matrix with all post contingency flows, one row per contingency
+    """
+    idx = np.array(failed_idx_list, dtype=int)  # B x k
+    k = idx.shape[1]
+
+    # one multiple contingency matrix per contingency (B x k x k)
+    M = -LODF[idx[:, :, np.newaxis], idx[:, np.newaxis, :]]
+    M[:, np.arange(k), np.arange(k)] = 1.0
+
+    # normal flows of the failed lines of every contingency (B x k)
+    F = flows[idx]
+
+    # Affected flows after failing the lines of every contingency, with a single batched solve
+    Ff = np.linalg.solve(M, F[:, :, np.newaxis])[:, :, 0]
+
+    # flow deltas after every contingency (B x nl)
+    L = LODF[:, idx]  # nl x B x k
+    dFf = np.einsum('nbk,bk->bn', L, Ff)
+
+    # return the final contingency flows as the base flow plus the contingency flow deltas
+    return flows[np.newaxis, :] + dFf
+
+
 def get_n_minus_1_flows(circuit: MultiCircuit):
 
     opt = PowerFlowOptions()
@@ -187,12 +211,14 @@ def get_n_minus_1_flows(circuit: MultiCircuit):
     m = circuit.get_branch_number()
     Pmat = np.zeros((m, m))  # monitored, contingency
 
+    # the driver compiles the circuit on every run, so it picks up the status changes
+    pf = PowerFlowDriver(circuit, opt)
+
     for c, branch in enumerate(branches):
 
         if branch.active:
             branch.active = False
 
-            pf = PowerFlowDriver(circuit, opt)
             pf.run()
             Pmat[:, c] = pf.results.Sbranch.real
 
@@ -216,12 +242,9 @@ def check_lodf(grid: MultiCircuit):
     Pbus = circuit.get_injections(False).real
     flows_n = np.dot(PTDF, Pbus)
 
-    nl = circuit.nbr
-    flows_n1 = np.zeros((nl, nl))
-    for c in range(nl):  # branch that fails (contingency)
-        # for m in range(nl):  # branch to monitor
-        #     flows_n1[m, c] = flows_n[m] + LODF[m, c] * flows_n[c]
-        flows_n1[:, c] = flows_n[:] + LODF[:, c] * flows_n[c]
+    # for every branch m to monitor and branch c that fails (contingency):
+    #     flows_n1[m, c] = flows_n[m] + LODF[m, c] * flows_n[c]
+    flows_n1 = flows_n[:, np.newaxis] + LODF * flows_n[np.newaxis, :]
 
     return flows_n, flows_n1_nr, flows_n1
 
@@ -277,6 +300,12 @@ if __name__ == '__main__':
                                       failed_idx=[1, 2])
     print('Linear contingency flows:\n', flows_multiple)
 
+    # the batched contingency flows must match the per-contingency ones
+    contingencies_ = [[1, 2], [0, 3], [2, 4], [3, 5]]
+    flows_batched = multiple_failure_batched(flows=flows_n_, LODF=LODF_, failed_idx_list=contingencies_)
+    flows_loop = np.array([multiple_failure(flows=flows_n_, LODF=LODF_, failed_idx=c) for c in contingencies_])
+    assert np.allclose(flows_batched, flows_loop)
+
     Pn1_nr_df = pd.DataFrame(data=flows_n1_nr_, index=nc_.branch_names, columns=nc_.branch_names)
     flows_n1_df = pd.DataFrame(data=flows_n1_, index=nc_.branch_names, columns=nc_.branch_names)
 
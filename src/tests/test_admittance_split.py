@@ -0,0 +1,76 @@
+# This file is part of GridCal.
+#
+# GridCal is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GridCal is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GridCal.  If not, see <http://www.gnu.org/licenses/>.
+import os
+import numpy as np
+
+from GridCal.Engine import *
+
+
+def get_island():
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    main_circuit = FileOpen(fname).open()
+    numerical_circuit = compile_snapshot_circuit(main_circuit)
+    return numerical_circuit.split_into_islands()[0]
+
+
+def check_split(Y, G, B):
+    assert np.allclose(G.toarray(), Y.real.toarray())
+    assert np.allclose(B.toarray(), Y.imag.toarray())
+
+    # no array is shared with the source matrix or between the parts
+    for arr in [G.data, G.indices, G.indptr]:
+        assert not np.shares_memory(arr, Y.data)
+        assert not np.shares_memory(arr, Y.indices)
+        assert not np.shares_memory(arr, Y.indptr)
+        assert not np.shares_memory(arr, B.data)
+        assert not np.shares_memory(arr, B.indices)
+        assert not np.shares_memory(arr, B.indptr)
+
+
+def test_ybus_split_cache():
+    island = get_island()
+
+    Ybus = island.Ybus
+    G, B = island.Ybus_split
+    check_split(Ybus, G, B)
+
+    # the split is reused while Ybus does not change
+    G2, B2 = island.Ybus_split
+    assert G2 is G and B2 is B
+
+    # changing the taps replaces Ybus, the split must be rebuilt from the new matrix
+    island.re_calc_admittance_matrices(tap_module=island.branch_data.m[:, 0] * 1.05)
+    Ybus_new = island.Ybus
+    assert Ybus_new is not Ybus
+    assert not np.allclose(Ybus_new.toarray(), Ybus.toarray())
+
+    G3, B3 = island.Ybus_split
+    assert G3 is not G and B3 is not B
+    check_split(Ybus_new, G3, B3)
+
+    # sorting the source matrix in place does not affect the split
+    Ybus_new.has_sorted_indices = False
+    Ybus_new.sort_indices()
+    check_split(Ybus_new, G3, B3)
+
+
+def test_yseries_split():
+    island = get_island()
+
+    Gs, Bs = island.Yseries_split
+    check_split(island.Yseries, Gs, Bs)
+
+    Gs2, Bs2 = island.Yseries_split
+    assert Gs2 is Gs and Bs2 is Bs
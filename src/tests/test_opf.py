@@ -35,5 +35,77 @@ def test_opf():
     opf.run()
 
 
+def test_ac_opf_fixed_voltage_increments():
+    """
+    The slack angles and the slack and pv modules are zeros from the start of the formulation,
+    so neither the branch flows nor the LP see any variable for them,
+    and the nodal power balance does not modify the arrays it receives
+    """
+    from GridCal.Engine.Core.snapshot_opf_data import compile_snapshot_opf_circuit
+    from GridCal.Engine.Simulations.OPF.ac_opf import OpfAc, get_fixed_voltage_increments_idx, \
+        add_ac_nodal_power_balance
+    from GridCal.ThirdParty.pulp import LpProblem, LpVariable, lpMakeVars
+
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    main_circuit = FileOpen(fname).open()
+    nc = compile_snapshot_opf_circuit(main_circuit)
+
+    vd, vdpv = get_fixed_voltage_increments_idx(nc.split_into_islands())
+    assert len(vd) > 0
+    assert len(vdpv) > len(vd)
+
+    opf = OpfAc(nc)
+    problem = opf.formulate()  # the constructor resets the variables of the formulation
+    lp_names = {var.name for var in problem.variables()}
+
+    for i in range(nc.nbus):
+        if i in vd:
+            assert opf.dva[i] == 0
+        else:
+            assert isinstance(opf.dva[i], LpVariable)
+
+        if i in vdpv:
+            assert opf.dvm[i] == 0
+        else:
+            assert isinstance(opf.dvm[i], LpVariable)
+
+    assert not any('dva_' + str(i) in lp_names for i in vd)
+    assert not any('dvm_' + str(i) in lp_names for i in vdpv)
+
+    # the nodal balance has no side effects on the variables
+    dva = lpMakeVars(name='dva', shape=nc.nbus, lower=-3.14, upper=3.14)
+    dvm = lpMakeVars(name='dvm', shape=nc.nbus, lower=0, upper=2)
+    dva_copy = dva.copy()
+    dvm_copy = dvm.copy()
+    P = np.zeros(nc.nbus)
+    Q = np.zeros(nc.nbus)
+    add_ac_nodal_power_balance(numerical_circuit=nc, problem=LpProblem(name='test'), dvm=dvm, dva=dva, P=P, Q=Q)
+    assert all(a is b for a, b in zip(dva, dva_copy))
+    assert all(a is b for a, b in zip(dvm, dvm_copy))
+
+
+def test_ac_opf_ts_fixed_voltage_increments():
+    from GridCal.Engine.Core.time_series_opf_data import compile_opf_time_circuit
+    from GridCal.Engine.Simulations.OPF.ac_opf_ts import OpfAcTimeSeries, get_fixed_voltage_increments_idx
+    from GridCal.ThirdParty.pulp import LpVariable
+
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    main_circuit = FileOpen(fname).open()
+    nc = compile_opf_time_circuit(main_circuit)
+
+    vd, vdpv = get_fixed_voltage_increments_idx(nc.split_into_islands())
+    assert len(vd) > 0
+
+    opf = OpfAcTimeSeries(nc, start_idx=0, end_idx=4)
+
+    # the variables are kept as (time, bus)
+    assert np.all(opf.dva[:, vd] == 0)
+    assert np.all(opf.dvm[:, vdpv] == 0)
+    free_va = np.setdiff1d(np.arange(nc.nbus), vd)
+    free_vm = np.setdiff1d(np.arange(nc.nbus), vdpv)
+    assert all(isinstance(var, LpVariable) for var in opf.dva[:, free_va].ravel())
+    assert all(isinstance(var, LpVariable) for var in opf.dvm[:, free_vm].ravel())
+
+
 if __name__ == '__main__':
     test_opf()
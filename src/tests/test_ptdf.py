@@ -1,4 +1,5 @@
 from GridCal.Engine import *
+from GridCal.Engine.Simulations.LinearFactors.linear_analysis import make_ptdf, make_lodf, lodf_from_h
 
 
 def test_ptdf():
@@ -44,5 +45,70 @@ def test_ptdf():
     return True
 
 
+def lodf_numpy(H, correct_values):
+    """
+    Former numpy LODF formula, from H = PTDF x Cft^T
+    """
+    nl = H.shape[0]
+
+    # this loop avoids the divisions by zero
+    # in those cases the LODF column should be zero
+    LODF = np.zeros((nl, nl))
+    div = 1 - H.diagonal()
+    for j in range(H.shape[1]):
+        if div[j] != 0:
+            LODF[:, j] = H[:, j] / div[j]
+
+    # replace the diagonal elements by -1
+    for i in range(nl):
+        LODF[i, i] = - 1.0
+
+    if correct_values:
+        i1, j1 = np.where(LODF > 1)
+        for i, j in zip(i1, j1):
+            LODF[i, j] = 1
+
+        i2, j2 = np.where(LODF < -1)
+        for i, j in zip(i2, j2):
+            LODF[i, j] = -1
+
+    return LODF
+
+
+def test_lodf():
+    fname = os.path.join('data', 'grids', 'PGOC_6bus.gridcal')
+    main_circuit = FileOpen(fname).open()
+    circuit = compile_snapshot_circuit(main_circuit).split_into_islands()[0]
+
+    PTDF = make_ptdf(Bbus=circuit.Bbus, Bf=circuit.Bf, pqpv=circuit.pqpv, distribute_slack=False)
+    H = np.asarray(PTDF * (circuit.Cf - circuit.Ct).T)
+
+    for correct_values in [True, False]:
+        LODF = make_lodf(Cf=circuit.Cf, Ct=circuit.Ct, PTDF=PTDF, correct_values=correct_values)
+        assert np.allclose(LODF, lodf_numpy(H, correct_values))
+        assert np.all(LODF.diagonal() == -1.0)
+
+
+def test_lodf_from_h_limits():
+    """
+    Branches with 1 - H[j, j] = 0 (radial branches) and values out of the [-1, 1] range
+    """
+    np.random.seed(0)
+    H = np.random.uniform(-3, 3, (8, 8))
+    H[2, 2] = 1.0  # the column 2 cannot be divided
+    H[5, 5] = 1.0  # the column 5 cannot be divided
+
+    for correct_values in [True, False]:
+        LODF = lodf_from_h(H, correct_values)
+        expected = lodf_numpy(H, correct_values)
+        assert np.allclose(LODF, expected)
+        assert np.all(LODF.diagonal() == -1.0)
+        assert np.all(LODF[[0, 1, 3, 4, 6, 7], 2] == 0.0)
+        assert np.all(LODF[[0, 1, 3, 4, 6, 7], 5] == 0.0)
+
+    assert np.abs(lodf_from_h(H, False)).max() > 1
+    assert np.abs(lodf_from_h(H, True)).max() == 1
+
+
 if __name__ == '__main__':
     test_ptdf()
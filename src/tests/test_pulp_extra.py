@@ -0,0 +1,143 @@
+# This file is part of GridCal.
+#
+# GridCal is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GridCal is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GridCal.  If not, see <http://www.gnu.org/licenses/>.
+import numpy as np
+from scipy.sparse import csc_matrix, csr_matrix
+
+from GridCal.ThirdParty.pulp import LpVariable, lpDot, lpDotSubMatrix
+
+
+def get_matrix():
+    """
+    Small sparse matrix with an empty row (2), an explicitly stored zero (row 3), unit and non unit values
+    """
+    data = np.array([1.0, 2.5, 1.0, -3.0, 1.0, 0.0, 4.0, 1.0, -1.0])
+    rows = np.array([0, 0, 1, 1, 3, 3, 4, 4, 4])
+    cols = np.array([0, 2, 1, 3, 0, 1, 1, 2, 3])
+    return csc_matrix((data, (rows, cols)), shape=(5, 4))
+
+
+def get_variables(n, m=None):
+    if m is None:
+        return np.array([LpVariable('x_' + str(i)) for i in range(n)], dtype=object)
+    else:
+        return np.array([[LpVariable('x_' + str(i) + '_' + str(j)) for j in range(m)] for i in range(n)],
+                        dtype=object)
+
+
+def terms(expr):
+    """
+    Normalized (coefficients, constant) of a linear expression, without the zero coefficients
+    """
+    if isinstance(expr, (int, float)):
+        return dict(), float(expr)
+
+    if isinstance(expr, LpVariable):
+        return {expr.name: 1.0}, 0.0
+
+    return {var.name: coeff for var, coeff in expr.items() if coeff != 0}, float(expr.constant)
+
+
+def compare(res, expected):
+    assert res.shape == expected.shape
+    for a, b in zip(res.ravel(), expected.ravel()):
+        assert terms(a) == terms(b)
+
+
+def test_lp_dot_vector():
+    A = get_matrix()
+    x = get_variables(A.shape[1])
+
+    expected = np.dot(A.toarray(), x)
+
+    compare(lpDot(A, x), expected)
+    compare(lpDot(csr_matrix(A), x), expected)
+
+    # the empty row has no terms
+    assert terms(lpDot(A, x)[2]) == (dict(), 0.0)
+
+
+def test_lp_dot_matrix():
+    A = get_matrix()
+    x = get_variables(A.shape[1], 3)
+
+    expected = np.dot(A.toarray(), x)
+
+    compare(lpDot(A, x), expected)
+    compare(lpDot(csr_matrix(A), x), expected)
+
+
+def test_lp_dot_numeric():
+    A = get_matrix()
+    x = np.random.rand(A.shape[1])
+    y = np.random.rand(A.shape[1], 3)
+
+    assert np.allclose(lpDot(A, x), np.dot(A.toarray(), x))
+    assert np.allclose(lpDot(A, y), np.dot(A.toarray(), y))
+
+
+def test_lp_dot_sub_matrix_vector():
+    A = get_matrix()
+    x = get_variables(A.shape[1])
+    row_idx = np.array([4, 2, 0, 3])
+    col_idx = np.array([1, 3, 0])
+
+    # the non selected columns of arr must be ignored
+    expected = np.dot(A.toarray()[np.ix_(row_idx, col_idx)], x[col_idx])
+    compare(lpDotSubMatrix(A, row_idx, col_idx, x), expected)
+
+    # all the columns
+    expected = np.dot(A.toarray()[row_idx, :], x)
+    compare(lpDotSubMatrix(A, row_idx, None, x), expected)
+    compare(lpDotSubMatrix(csr_matrix(A), row_idx, None, x), expected)
+
+
+def test_lp_dot_sub_matrix_matrix():
+    A = get_matrix()
+    x = get_variables(A.shape[1], 3)
+    row_idx = np.array([0, 1, 2, 4])
+    col_idx = np.array([0, 2, 3])
+
+    expected = np.dot(A.toarray()[np.ix_(row_idx, col_idx)], x[col_idx, :])
+    compare(lpDotSubMatrix(A, row_idx, col_idx, x), expected)
+
+    expected = np.dot(A.toarray()[row_idx, :], x)
+    compare(lpDotSubMatrix(A, row_idx, None, x), expected)
+
+
+def test_lp_dot_sub_matrix_duplicates():
+    """
+    The repeated entries of a non canonical CSR matrix must be added as in a dot product
+    """
+    data = np.array([1.0, 3.0, 2.0, 4.0, 1.5])
+    indices = np.array([0, 1, 0, 1, 1])
+    indptr = np.array([0, 3, 5])
+    A = csr_matrix((data, indices, indptr), shape=(2, 2))
+    assert not A.has_canonical_format
+
+    x = get_variables(2)
+    y = get_variables(2, 3)
+    row_idx = np.array([0, 1])
+
+    expected = np.dot(A.toarray(), x)
+    compare(lpDot(A, x), expected)
+    compare(lpDotSubMatrix(A, row_idx, None, x), expected)
+    compare(lpDotSubMatrix(A, row_idx, np.array([0, 1]), x), expected)
+    assert terms(lpDotSubMatrix(A, row_idx, None, x)[0]) == ({'x_0': 3.0, 'x_1': 3.0}, 0.0)
+
+    compare(lpDotSubMatrix(A, row_idx, None, y), np.dot(A.toarray(), y))
+
+    # the input matrix is not modified
+    assert not A.has_canonical_format
+    assert len(A.data) == 5
@@ -0,0 +1,108 @@
+# This file is part of GridCal.
+#
+# GridCal is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GridCal is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GridCal.  If not, see <http://www.gnu.org/licenses/>.
+import os
+import numpy as np
+
+from GridCal.Engine import *
+from GridCal.Engine.Simulations.SigmaAnalysis.sigma_analysis_driver import sigma_distance, multi_island_sigma
+
+
+def sigma_distance_scalar(sigma_real, sigma_imag):
+    """
+    Original point by point implementation of sigma_distance
+    (the fractional power of a negative numpy float is nan)
+    """
+    n = len(sigma_real)
+    x1 = np.zeros(n)
+
+    i = 0
+    sq3 = np.sqrt(3)
+
+    for a, b in zip(sigma_real, sigma_imag):
+
+        t0 = -64 * a ** 3 * b ** 2 \
+             + 48 * a ** 2 * b ** 2 \
+             - 12 * a * b ** 2 \
+             + 108 * b ** 4 + b ** 2
+
+        if t0 > 0:
+
+            t1 = (-64 * a**3
+                  + 48 * a**2
+                  + 12 * sq3 * np.sqrt(t0)
+                  - 12 * a + 216 * b**2 + 1)**(1 / 3)
+
+            # the value is within limits
+            x1[i] = 1 / 12 * t1 - (-256 * a**2 + 128 * a - 16) / (192 * t1) + 1 / 12 * (8 * a - 5)
+        else:
+            t1 = (-64 * a ** 3
+                  + 48 * a ** 2
+                  + 12 * sq3 * np.sqrt(-t0)
+                  - 12 * a + 216 * b ** 2 + 1) ** (1 / 3)
+
+            # here I set the value negative to indicate that it is off-limits
+            x1[i] = -(1 / 12 * t1 - (-256 * a**2 + 128 * a - 16) / (192 * t1) + 1 / 12 * (8 * a - 5))
+
+        i += 1
+
+    return x1
+
+
+def test_sigma_distance():
+    np.random.seed(0)
+    n = 2000
+    a = np.random.uniform(-3, 3, n)
+    b = np.random.uniform(-3, 3, n)
+
+    # include the origin and points on the real axis (t0 = 0)
+    a[:3] = [0.0, 0.5, -1.0]
+    b[:3] = 0.0
+
+    with np.errstate(invalid='ignore'):
+        expected = sigma_distance_scalar(a, b)
+        d = sigma_distance(a, b)
+
+    # the random sample must contain both valid values and the nan values of the negative radicands
+    nan_idx = np.isnan(expected)
+    assert nan_idx.any()
+    assert (~nan_idx).any()
+
+    assert np.array_equal(np.isnan(d), nan_idx)
+    assert np.allclose(d[~nan_idx], expected[~nan_idx])
+
+    # the distance of the origin is the default distance of the results
+    assert np.isclose(d[0], 0.25)
+
+
+def test_sigma_distance_pqpv_only():
+    """
+    The distances are computed only at the pq and pv buses, the rest keep the default 0.25
+    that the original implementation obtained for the zero sigma values of the slack buses
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    main_circuit = FileOpen(fname).open()
+
+    options = PowerFlowOptions(SolverType.HELM, tolerance=1e-6)
+    results = multi_island_sigma(multi_circuit=main_circuit, options=options)
+
+    with np.errstate(invalid='ignore'):
+        expected = sigma_distance_scalar(results.sigma_re, results.sigma_im)
+
+    assert np.array_equal(np.isnan(results.distances), np.isnan(expected))
+    nan_idx = np.isnan(expected)
+    assert np.allclose(results.distances[~nan_idx], expected[~nan_idx])
+
+    nc = compile_snapshot_circuit(main_circuit)
+    assert np.allclose(results.distances[nc.vd], 0.25)
@@ -0,0 +1,208 @@
+# This file is part of GridCal.
+#
+# GridCal is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GridCal is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GridCal.  If not, see <http://www.gnu.org/licenses/>.
+import os
+import time
+import zipfile
+from io import BytesIO, TextIOWrapper
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from GridCal.Engine.Simulations.driver_types import SimulationTypes
+import GridCal.Engine.IO.zip_interface as zip_interface
+from GridCal.Engine.IO.zip_interface import get_xml_content, get_xml_from_zip, save_data_frames_to_zip, \
+    get_frames_from_zip, get_session_tree, load_session_driver_objects
+
+
+CIM_FRAGMENT = ('<?xml version="1.0" encoding="UTF-8"?>\r\n'
+                '<rdf:RDF xmlns:cim="http://iec.ch/TC57/2009/CIM-schema-cim14#">\r\n'
+                '<cim:ACLineSegment rdf:ID="_L1">\r\n'
+                '<cim:IdentifiedObject.name>Línea Peñíscola\x0c Ñ</cim:IdentifiedObject.name>\r\n'
+                '</cim:ACLineSegment>\r\n'
+                '</rdf:RDF>\r\n')
+
+
+def test_xml_content_crlf_non_ascii():
+    """
+    The lines must be the same that a text reader with universal newlines produces
+    """
+    data = CIM_FRAGMENT.encode('utf-8')
+
+    expected = [line for line in TextIOWrapper(BytesIO(data), encoding='utf-8')]
+    lines = get_xml_content(BytesIO(data))
+
+    assert lines == expected
+    assert len(lines) == 6
+    assert all(line.endswith('\n') and not line.endswith('\r\n') for line in lines)
+    assert 'Línea Peñíscola\x0c Ñ' in lines[3]
+
+
+def test_xml_content_from_zip(tmp_path):
+    fname = os.path.join(str(tmp_path), 'cim.zip')
+    with zipfile.ZipFile(fname, 'w') as f_zip:
+        f_zip.writestr('EQ.xml', CIM_FRAGMENT.encode('utf-8'))
+
+    data = get_xml_from_zip(fname)
+
+    assert data['EQ'] == [line for line in TextIOWrapper(BytesIO(CIM_FRAGMENT.encode('utf-8')), encoding='utf-8')]
+
+
+def test_xml_content_wrong_encoding_raises():
+    """
+    A mis-declared encoding must fail instead of silently replacing the characters
+    """
+    data = CIM_FRAGMENT.replace('UTF-8', 'ascii').encode('utf-8')
+
+    with pytest.raises(UnicodeDecodeError):
+        get_xml_content(BytesIO(data))
+
+
+def open_handles(file_name):
+    """
+    Number of file descriptors of this process pointing to a file (linux only)
+    """
+    fd_dir = '/proc/self/fd'
+    real = os.path.realpath(file_name)
+    n = 0
+    for fd in os.listdir(fd_dir):
+        try:
+            if os.path.realpath(os.path.join(fd_dir, fd)) == real:
+                n += 1
+        except OSError:
+            pass
+    return n
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason='needs /proc')
+def test_zip_readers_close_the_file(tmp_path):
+    fname = os.path.join(str(tmp_path), 'frames.gridcal')
+    dfs = {'buses': pd.DataFrame({'name': ['a', 'b'], 'Vnom': [10.0, 20.0]}),
+           'loads_P_prof': pd.DataFrame(np.random.rand(4, 2), columns=['l1', 'l2'])}
+
+    save_data_frames_to_zip(dfs, filename_zip=fname)
+
+    data = get_frames_from_zip(fname)
+    tree = get_session_tree(fname)
+    arrays = load_session_driver_objects(fname, 'session', 'study')
+
+    assert set(data.keys()) == {'buses', 'loads_P_prof'}
+    assert np.allclose(data['loads_P_prof'].values, dfs['loads_P_prof'].values)
+    assert tree == dict()
+    assert arrays == dict()
+    assert open_handles(fname) == 0
+
+
+def test_save_frames_in_flight(tmp_path, monkeypatch):
+    """
+    Only a window of DataFrames is serialized ahead of the zip writer, and the entries keep their order
+    """
+    fname = os.path.join(str(tmp_path), 'frames.gridcal')
+    dfs = {'profile_' + str(i): pd.DataFrame(np.random.rand(10, 3), columns=['a', 'b', 'c']) for i in range(20)}
+
+    n_serialized = [0]
+    serialize_data_frame = zip_interface.serialize_data_frame
+
+    def counting_serialize(name, df):
+        n_serialized[0] += 1
+        return serialize_data_frame(name, df)
+
+    monkeypatch.setattr(zip_interface, 'serialize_data_frame', counting_serialize)
+
+    written = list()
+
+    def text_func(txt):
+        # called right before writing each entry, the delay lets the serialization run ahead of the writer
+        written.append(txt)
+        time.sleep(0.01)
+        assert n_serialized[0] <= len(written) + (os.cpu_count() or 1)
+
+    save_data_frames_to_zip(dfs, filename_zip=fname, text_func=text_func)
+
+    assert n_serialized[0] == len(dfs)
+    assert written == ['Flushing ' + name + ' to ' + fname + '...' for name in dfs]
+
+    data = get_frames_from_zip(fname)
+    for name, df in dfs.items():
+        assert np.allclose(data[name].values, df.values)
+
+
+def test_zipfile_module_untouched():
+    """
+    Importing the GridCal IO must not patch the standard library zipfile module
+    """
+    import zlib
+    import GridCal.Engine.IO.zip_interface  # noqa: F401
+
+    assert zipfile.zlib is zlib
+    assert zipfile.crc32 is zlib.crc32
+
+
+class FakeResults:
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+
+    def get_arrays(self):
+        return self.arrays
+
+
+class FakeDriver:
+
+    def __init__(self, arrays):
+        self.results = FakeResults(arrays)
+        self.tpe = SimulationTypes.PowerFlow_run
+
+
+class FakeSession:
+
+    def __init__(self, name, arrays):
+        self.name = name
+        self.drivers = {'driver': FakeDriver(arrays)}
+
+
+def test_session_arrays_round_trip(tmp_path):
+    fname = os.path.join(str(tmp_path), 'session.gridcal')
+
+    arrays = {'bus_names': np.array(['b1', 'bus 2', 'Barra 3 ñ'], dtype=object),
+              'mixed': np.array(['a', None, np.nan, 3], dtype=object),
+              'empty_names': np.array([], dtype=object),
+              'voltage': np.array([1.0 + 0.1j, 0.98 - 0.05j]),
+              'loading': np.random.rand(3, 2),
+              'converged': np.array([True, False])}
+
+    save_data_frames_to_zip(dict(), filename_zip=fname, sessions=[FakeSession('session', arrays)])
+
+    tree = get_session_tree(fname)
+    data = load_session_driver_objects(fname, 'session', SimulationTypes.PowerFlow_run.value)
+
+    assert set(tree['session'][SimulationTypes.PowerFlow_run.value]) == {name + '.npy' for name in arrays}
+    assert set(data.keys()) == set(arrays.keys())
+
+    # the arrays of strings are stored as unicode arrays, without pickle
+    assert data['bus_names'].dtype.kind == 'U'
+    assert list(data['bus_names']) == list(arrays['bus_names'])
+    assert len(data['empty_names']) == 0
+
+    # any other object array comes back as it was
+    assert data['mixed'].dtype == object
+    assert data['mixed'][0] == 'a'
+    assert data['mixed'][1] is None
+    assert np.isnan(data['mixed'][2])
+    assert data['mixed'][3] == 3
+
+    for name in ['voltage', 'loading', 'converged']:
+        assert data[name].dtype == arrays[name].dtype
+        assert np.array_equal(data[name], arrays[name])